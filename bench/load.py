@@ -0,0 +1,461 @@
+"""多会话并发的离线负载模拟
+
+每个会话是一个协程：按随机间隔开局（经典或Octordle）、由几名玩家猜测，
+夹杂非法输入，部分对局中途用wordle stop放弃或无人理会直到过期。
+猜测按到达时间发出而不等待上一条处理完（开环），同一会话的猜测会像真实群聊一样被合并。
+延迟为从发出消息到玩家收到回复的时间：命令以第一条回复为准，
+有效猜测以之后该会话第一次发送棋盘为准。
+定期输出吞吐、活跃会话数和内存，结束时汇总各命令的延迟分位数、事件循环延迟和峰值RSS。
+
+用法:
+    python bench/load.py --sessions 1000 --duration 60
+    python bench/load.py --sessions 5000 --render-mode process --out load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import traceback
+from collections import defaultdict
+from typing import Any
+
+from stubs import (  # type: ignore
+    AstrBotConfig,
+    StubContext,
+    StubEvent,
+    install_astrbot_stubs,
+    load_plugin_module,
+)
+
+# 事件循环延迟的采样间隔（秒）
+LAG_INTERVAL = 0.05
+QUANTILES = (0.5, 0.95, 0.99)
+INVALID_KINDS = ("length", "not_alpha", "unknown_word")
+
+
+def quantiles(samples: list[float]) -> dict[str, float]:
+    """毫秒为单位的分位数和最大值"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    result: dict[str, float] = {"count": len(ordered)}
+    for q in QUANTILES:
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        result[f"p{round(q * 100)}_ms"] = ordered[index] * 1000
+    result["max_ms"] = ordered[-1] * 1000
+    return result
+
+
+def current_rss_kb() -> int:
+    """当前RSS，不支持/proc时退回到峰值RSS"""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_kb()
+
+
+def peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS下单位为字节，Linux下为KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class LoadEvent(StubEvent):
+    """发送时模拟平台耗时并通知模拟器，不保留发送的内容"""
+
+    def __init__(self, *args, sim: "Simulation", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sim = sim
+
+    async def send(self, chain):
+        sent_at = time.perf_counter()
+        latency = self.sim.args.send_latency_ms / 1000
+        if latency > 0:
+            await asyncio.sleep(latency)
+        self.sim.board_sent(self.unified_msg_origin, sent_at)
+
+
+class LoadContext(StubContext):
+    """只统计过期通知的数量，避免长时间运行时累积消息"""
+
+    def __init__(self):
+        super().__init__()
+        self.notifications = 0
+
+    async def send_message(self, session_id: str, chain):
+        self.notifications += 1
+
+
+class Simulation:
+    def __init__(self, plugin, args, words: dict[int, list[str]]):
+        self.plugin = plugin
+        self.args = args
+        self.words = words
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        # 会话 -> 等待棋盘回复的有效猜测的发出时间
+        self.awaiting: dict[str, list[float]] = defaultdict(list)
+        self.unanswered = 0
+        self.in_flight: set[asyncio.Task] = set()
+        self.messages = 0
+        self.games_started = 0
+        self.games_abandoned = 0
+        self.loop_lag: list[float] = []
+        self.timeline: list[dict[str, Any]] = []
+        self.peak_active = 0
+        self.stopping = False
+
+    def event(self, message: str, session_id: str, sender: str) -> LoadEvent:
+        return LoadEvent(
+            message,
+            session_id,
+            sender,
+            f"player{sender}",
+            sim=self,
+        )
+
+    async def command(self, name: str, generator) -> bool:
+        """执行一个命令处理器，返回是否有直接回复
+
+        有回复时以第一条回复的时间作为延迟，没有时以处理完成的时间（猜测除外）
+        """
+        start = time.perf_counter()
+        replied = False
+        try:
+            if generator is not None:
+                async for _ in generator:
+                    if not replied:
+                        self.latencies[name].append(time.perf_counter() - start)
+                        replied = True
+        except Exception:
+            if not self.errors[name]:
+                traceback.print_exc()
+            self.errors[name] += 1
+        if not replied and name != "guess":
+            self.latencies[name].append(time.perf_counter() - start)
+        self.messages += 1
+        return replied
+
+    async def guess(self, session_id: str, event: LoadEvent):
+        """有效猜测没有直接回复，在该会话下一次发送棋盘时计算延迟"""
+        start = time.perf_counter()
+        waiting = self.awaiting[session_id]
+        waiting.append(start)
+        replied = await self.command("guess", self.plugin.on_all_message(event))
+        # 被直接拒绝（如对局已更换）时延迟已按回复记录
+        if replied and start in waiting:
+            waiting.remove(start)
+
+    def board_sent(self, session_id: str, sent_at: float):
+        """一次棋盘发送回复了开始发送前到达的全部猜测（包括被合并的猜测）"""
+        waiting = self.awaiting.get(session_id)
+        if not waiting:
+            return
+        now = time.perf_counter()
+        answered = [start for start in waiting if start <= sent_at]
+        waiting[:] = [start for start in waiting if start > sent_at]
+        self.latencies["guess"].extend(now - start for start in answered)
+
+    def fire(self, coroutine):
+        """不等待处理完成就继续发送下一条消息"""
+        task = asyncio.create_task(coroutine)
+        self.in_flight.add(task)
+        task.add_done_callback(self.in_flight.discard)
+
+    async def think(self, rng: random.Random, mean: float):
+        """玩家之间的间隔，按指数分布模拟"""
+        if mean > 0:
+            await asyncio.sleep(rng.expovariate(1 / mean))
+
+    def invalid_message(self, rng: random.Random, game) -> tuple[str, str]:
+        """长度不对、包含非字母或不在词表中的输入，返回(类型, 消息)"""
+        kind = rng.choice(INVALID_KINDS)
+        length = game.length
+        if kind == "length":
+            return kind, rng.choice(self.words[length])[: length - 1].lower()
+        if kind == "not_alpha":
+            return kind, "".join(rng.choice("0123456789") for _ in range(length))
+        while True:
+            word = "".join(rng.choice("QXZJV") for _ in range(length))
+            if word not in game.valid_words:
+                return kind, word.lower()
+
+    async def start_game(self, rng: random.Random, session_id: str, sender: str):
+        # 上一局结束时仍未得到回复的猜测（对局已结束或已过期）
+        self.unanswered += len(self.awaiting.pop(session_id, []))
+        event = self.event("wordle", session_id, sender)
+        if rng.random() < self.args.octordle_ratio:
+            event.message = "wordle octordle"
+            await self.command("octordle", self.plugin.start_octordle(event))
+        else:
+            length = rng.choice(self.args.lengths)
+            event.message = f"wordle start {length}"
+            await self.command("start", self.plugin.start_wordle(event, length))
+        self.games_started += 1
+
+    def pick_guess(self, rng: random.Random, game) -> str:
+        """以solve_ratio的概率猜其中一个答案，否则随机猜一个有效单词"""
+        if rng.random() < self.args.solve_ratio:
+            return rng.choice(game.answer.split("/")).lower()
+        return rng.choice(self.words[game.length]).lower()
+
+    async def play_session(self, index: int):
+        rng = random.Random(f"{self.args.seed}:{index}")
+        session_id = f"load:group:{index}"
+        players = [f"{index}-{k}" for k in range(rng.randint(1, self.args.players))]
+        await asyncio.sleep(rng.uniform(0, self.args.ramp))
+
+        while not self.stopping:
+            await self.start_game(rng, session_id, rng.choice(players))
+            game = self.plugin.game_sessions.get(session_id)
+            abandon_after = None
+            if rng.random() < self.args.abandon_ratio:
+                abandon_after = rng.randint(0, max(0, game.max_attempts - 1))
+
+            guesses = 0
+            while not self.stopping and game is not None and not game.is_game_over:
+                await self.think(rng, self.args.think)
+                if self.plugin.game_sessions.get(session_id) is not game:
+                    # 已过期或被淘汰
+                    break
+                sender = rng.choice(players)
+                if abandon_after is not None and guesses >= abandon_after:
+                    self.games_abandoned += 1
+                    if rng.random() < 0.5:
+                        event = self.event("wordle stop", session_id, sender)
+                        await self.command("stop", self.plugin.stop_wordle(event))
+                    else:
+                        # 无人理会，等待过期清理
+                        await self.think(rng, self.args.idle)
+                    break
+
+                if rng.random() < self.args.invalid_ratio:
+                    kind, message = self.invalid_message(rng, game)
+                    event = self.event(message, session_id, sender)
+                    self.fire(
+                        self.command(
+                            f"invalid_{kind}", self.plugin.on_all_message(event)
+                        )
+                    )
+                else:
+                    event = self.event(self.pick_guess(rng, game), session_id, sender)
+                    self.fire(self.guess(session_id, event))
+                guesses += 1
+
+            await self.think(rng, self.args.idle)
+
+    async def monitor_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.loop_lag.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+    async def report(self, started: float):
+        """每隔report_interval秒记录并输出一行进度"""
+        last_messages, last_lag = 0, 0
+        last_time = started
+        print(
+            f"{'elapsed':>8} {'msg/s':>8} {'active':>7} {'expired':>8} "
+            f"{'evicted':>8} {'sess_mb':>8} {'canvas_mb':>9} {'rss_mb':>8} "
+            f"{'lag_p99':>8}"
+        )
+        while True:
+            await asyncio.sleep(self.args.report_interval)
+            now = time.perf_counter()
+            stats = self.plugin.game_sessions.stats()
+            lag = quantiles(self.loop_lag[last_lag:])
+            point = {
+                "elapsed": now - started,
+                "messages_per_sec": (self.messages - last_messages) / (now - last_time),
+                "active_sessions": stats["active"],
+                "expired_sessions": stats["expired"],
+                "evicted_sessions": stats["evicted"],
+                "session_memory_kb": stats["memory"] // 1024,
+                "canvas_cache_kb": self.plugin.renderer.canvases.size // 1024,
+                "rss_kb": current_rss_kb(),
+                "render_in_flight": self.plugin.renderer.in_flight,
+                "loop_lag_p99_ms": lag.get("p99_ms", 0.0),
+            }
+            self.timeline.append(point)
+            self.peak_active = max(self.peak_active, stats["active"])
+            last_messages, last_lag, last_time = (
+                self.messages,
+                len(self.loop_lag),
+                now,
+            )
+            print(
+                f"{point['elapsed']:7.0f}s {point['messages_per_sec']:8.1f} "
+                f"{point['active_sessions']:7d} {point['expired_sessions']:8d} "
+                f"{point['evicted_sessions']:8d} "
+                f"{point['session_memory_kb'] / 1024:8.1f} "
+                f"{point['canvas_cache_kb'] / 1024:9.1f} "
+                f"{point['rss_kb'] / 1024:8.1f} {point['loop_lag_p99_ms']:7.1f}ms"
+            )
+
+
+async def simulate(args) -> dict[str, Any]:
+    stubbed = install_astrbot_stubs()
+    main = load_plugin_module("main")
+    config = AstrBotConfig(
+        render_mode=args.render_mode,
+        render_workers=args.render_workers,
+        image_format=args.image_format,
+        board_mode=args.board_mode,
+        guess_batch_window_ms=args.batch_window_ms,
+        session_ttl_minutes=args.session_ttl / 60,
+        max_sessions=args.max_sessions,
+        # 模拟不写入插件目录下的data
+        session_persistence=False,
+        player_stats=False,
+    )
+    context = LoadContext()
+    plugin = main.PluginWordle(context, config)
+    dictionary = await asyncio.to_thread(
+        plugin.dictionaries.get, config.get("default_dict", "classic")
+    )
+    words = {length: sorted(dictionary.lookup(length)) for length in {5, *args.lengths}}
+
+    sim = Simulation(plugin, args, words)
+    start_rss = current_rss_kb()
+    started = time.perf_counter()
+    monitors = [
+        asyncio.create_task(sim.monitor_lag()),
+        asyncio.create_task(sim.report(started)),
+    ]
+    sessions = [
+        asyncio.create_task(sim.play_session(index)) for index in range(args.sessions)
+    ]
+    try:
+        await asyncio.sleep(args.duration)
+    finally:
+        sim.stopping = True
+        elapsed = time.perf_counter() - started
+        # 正在等待的会话不再继续，已开始处理的消息不计入
+        tasks = [*sessions, *monitors, *sim.in_flight]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        stats = plugin.game_sessions.stats()
+        await plugin.terminate()
+
+    numpy = load_plugin_module("games.scoring").np
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": numpy.__version__ if numpy is not None else None,
+            "astrbot_stubbed": stubbed,
+            "args": vars(args),
+        },
+        "summary": {
+            "elapsed": elapsed,
+            "messages": sim.messages,
+            "messages_per_sec": sim.messages / elapsed,
+            "games_started": sim.games_started,
+            "games_abandoned": sim.games_abandoned,
+            "unanswered_guesses": sim.unanswered,
+            "expire_notifications": context.notifications,
+            "peak_active_sessions": max(sim.peak_active, stats["active"]),
+            "final_sessions": stats,
+            "start_rss_kb": start_rss,
+            "peak_rss_kb": peak_rss_kb(),
+            "errors": dict(sim.errors),
+        },
+        "latency": {name: quantiles(v) for name, v in sorted(sim.latencies.items())},
+        "loop_lag": quantiles(sim.loop_lag),
+        "timeline": sim.timeline,
+    }
+
+
+def print_report(report: dict[str, Any]):
+    summary = report["summary"]
+    print(
+        f"\n{summary['messages']} messages in {summary['elapsed']:.1f}s "
+        f"({summary['messages_per_sec']:.1f}/s), "
+        f"{summary['games_started']} games started, "
+        f"{summary['games_abandoned']} abandoned, "
+        f"{summary['unanswered_guesses']} guesses unanswered"
+    )
+    print(f"{'command':<22} {'count':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    rows = {**report["latency"], "event_loop_lag": report["loop_lag"]}
+    for name, q in rows.items():
+        if not q["count"]:
+            continue
+        print(
+            f"{name:<22} {q['count']:8d} {q['p50_ms']:7.1f}ms {q['p95_ms']:7.1f}ms "
+            f"{q['p99_ms']:7.1f}ms {q['max_ms']:7.1f}ms"
+        )
+    final = summary["final_sessions"]
+    print(
+        f"sessions: peak active {summary['peak_active_sessions']}, "
+        f"expired {final['expired']}, evicted {final['evicted']}"
+    )
+    print(
+        f"RSS: start {summary['start_rss_kb'] / 1024:.1f}MB, "
+        f"peak {summary['peak_rss_kb'] / 1024:.1f}MB"
+    )
+    if summary["errors"]:
+        print(f"errors: {summary['errors']}")
+
+
+def parse_lengths(value: str) -> list[int]:
+    return [int(length) for length in value.split(",") if length]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="wordle插件多会话负载模拟")
+    parser.add_argument("--sessions", type=int, default=1000, help="并发会话数")
+    parser.add_argument("--duration", type=float, default=60, help="运行时长（秒）")
+    parser.add_argument("--ramp", type=float, default=10, help="会话在该时间内陆续开始")
+    parser.add_argument("--players", type=int, default=3, help="每个会话的最多玩家数")
+    parser.add_argument(
+        "--think", type=float, default=3, help="同一会话两条消息之间的平均间隔（秒）"
+    )
+    parser.add_argument(
+        "--idle",
+        type=float,
+        default=20,
+        help="对局结束或放弃后到下一局的平均间隔（秒）",
+    )
+    parser.add_argument("--lengths", type=parse_lengths, default=[5])
+    parser.add_argument("--octordle-ratio", type=float, default=0.2)
+    parser.add_argument("--invalid-ratio", type=float, default=0.15)
+    parser.add_argument("--abandon-ratio", type=float, default=0.2)
+    parser.add_argument(
+        "--solve-ratio", type=float, default=0.1, help="一次猜测直接猜答案的概率"
+    )
+    parser.add_argument(
+        "--send-latency-ms", type=float, default=50, help="模拟的平台发送耗时"
+    )
+    parser.add_argument("--session-ttl", type=float, default=120, help="会话过期秒数")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--batch-window-ms", type=float, default=0)
+    parser.add_argument("--render-mode", default="thread")
+    parser.add_argument("--render-workers", type=int, default=2)
+    parser.add_argument("--image-format", default="png-palette")
+    parser.add_argument("--board-mode", default="image")
+    parser.add_argument("--report-interval", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="结果JSON的保存路径")
+    args = parser.parse_args()
+
+    report = asyncio.run(simulate(args))
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""插件热点路径的基准测试
+
+用法:
+    python bench/run.py --out before.json
+    python bench/run.py --out after.json --filter render
+    python bench/run.py compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from stubs import (  # type: ignore
+    AstrBotConfig,
+    StubContext,
+    StubEvent,
+    install_astrbot_stubs,
+    load_plugin_module,
+)
+
+CLASSIC_LENGTHS = (4, 5, 6, 8)
+ANSWER_LENGTHS = (4, 5, 6, 7, 8)
+MULTI_BOARDS = (4, 8, 32)
+ENCODE_FORMATS = ("png", "png-palette", "webp")
+# 内存峰值单独用tracemalloc跑几轮，避免拖慢计时
+MEMORY_ROUNDS = 3
+
+
+def summarize(samples: list[float], ops: int, peak: int) -> dict[str, Any]:
+    ordered = sorted(samples)
+    mean = statistics.fmean(ordered)
+    return {
+        "iterations": len(ordered),
+        "ops_per_iteration": ops,
+        "mean_ms": mean * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "min_ms": ordered[0] * 1000,
+        "ops_per_sec": ops / mean if mean else 0.0,
+        "peak_kb": peak / 1024,
+    }
+
+
+class Runner:
+    def __init__(self, iterations: int, name_filter: str | None):
+        self.iterations = iterations
+        self.name_filter = name_filter
+        self.results: dict[str, dict[str, Any]] = {}
+
+    def selected(self, name: str) -> bool:
+        return self.name_filter is None or self.name_filter in name
+
+    async def run(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[Any] | Any],
+        ops: int = 1,
+        iterations: int | None = None,
+        warmup: int = 1,
+    ):
+        """fn每次调用算一轮，包含ops次操作；协程函数会被await"""
+        if not self.selected(name):
+            return
+
+        async def call():
+            result = fn()
+            if asyncio.iscoroutine(result):
+                await result
+
+        for _ in range(warmup):
+            await call()
+
+        samples = []
+        for _ in range(iterations or self.iterations):
+            start = time.perf_counter()
+            await call()
+            samples.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        for _ in range(MEMORY_ROUNDS):
+            await call()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.results[name] = summarize(samples, ops, peak)
+        result = self.results[name]
+        print(
+            f"{name:<40} p50 {result['p50_ms']:9.3f}ms  "
+            f"p95 {result['p95_ms']:9.3f}ms  {result['ops_per_sec']:12.1f} ops/s"
+        )
+
+
+def random_words(words, count: int, rng: random.Random) -> list[str]:
+    pool = sorted(words)
+    return [rng.choice(pool) for _ in range(count)]
+
+
+async def bench_dictionaries(runner: Runner, plugin, modules, rng: random.Random):
+    registry_type = modules["dictionary"].DictionaryRegistry
+    for name in plugin.dictionaries.names():
+        await runner.run(
+            f"dict_load/{name}",
+            lambda name=name: registry_type(plugin.dict_folder).get(name),
+            iterations=max(3, runner.iterations // 10),
+        )
+
+        for length in ANSWER_LENGTHS:
+            await runner.run(
+                f"get_answers/{name}/{length}",
+                lambda name=name, length=length: plugin.get_answers(length, 1, name),
+            )
+
+
+async def bench_scoring(runner: Runner, plugin, modules, rng: random.Random):
+    scoring = modules["scoring"]
+    words = plugin.dictionaries.get("classic").lookup(5)
+    pairs = list(zip(random_words(words, 1000, rng), random_words(words, 1000, rng)))
+
+    def score_pairs():
+        for guess, answer in pairs:
+            scoring.score(guess, answer)
+
+    await runner.run("score/classic/5", score_pairs, ops=len(pairs))
+
+    constraints_type = modules["constraints"].HardModeConstraints
+    for name in plugin.dictionaries.names():
+        bucket = sorted(set(plugin.dictionaries.get(name).lookup(5)))
+        constraints = constraints_type(5)
+        answer = rng.choice(bucket)
+        for guess in random_words(bucket, 2, rng):
+            constraints.add(guess, scoring.score(guess, answer))
+        await runner.run(
+            f"hard_mode/matching/{name}/5",
+            lambda constraints=constraints, bucket=bucket: constraints.matching(bucket),
+        )
+        await runner.run(
+            f"hard_mode/check/{name}/5",
+            lambda constraints=constraints, bucket=bucket[:1000]: [
+                constraints.violation(word) for word in bucket
+            ],
+            ops=1000,
+        )
+
+    daily = modules["daily"]
+    schedule = daily.DailySchedule(
+        plugin.dictionaries.get("classic"), "classic", 5, "bench"
+    )
+    daily_answer = schedule.answer(0)
+    await runner.run(
+        "daily/feedback_table/classic/5",
+        lambda: schedule.feedback_codes(daily_answer),
+    )
+    puzzle = schedule.puzzle(daily.EPOCH)
+
+    def daily_feedback():
+        for guess, _ in pairs:
+            puzzle.feedback(guess)
+
+    await runner.run("daily/feedback/classic/5", daily_feedback, ops=len(pairs))
+
+    guesses = random_words(words, 100, rng)
+    for count in (8, 1024):
+        answers = random_words(words, count, rng)
+
+        def score_batch(answers=answers):
+            for guess in guesses:
+                scoring.score_many(guess, answers)
+
+        await runner.run(f"score_many/{count}", score_batch, ops=len(guesses))
+
+
+async def play_classic(plugin, classic, length: int, rng: random.Random):
+    answer, words = await plugin.get_answers(length, 1)
+    game = classic.WordleClassic(answer[0], words, plugin.renderer)
+    for guess in random_words(words, game.max_attempts - 1, rng):
+        await game.guess(guess)
+
+
+async def play_multi(plugin, multi, boards: int, rng: random.Random):
+    answers, words = await plugin.get_answers(5, boards)
+    game = multi.WordleMulti(answers, words, plugin.renderer)
+    for guess in random_words(words, game.max_attempts - 1, rng):
+        await game.guess(guess)
+    return game
+
+
+async def bench_rendering(runner: Runner, plugin, modules, rng: random.Random):
+    classic = modules["wordle_classic"]
+    multi = modules["wordle_multi"]
+    encode = modules["encode"]
+    options = plugin.renderer.encoder.options
+
+    for length in CLASSIC_LENGTHS:
+        await runner.run(
+            f"guess/classic/{length}",
+            lambda length=length: play_classic(plugin, classic, length, rng),
+            ops=length,
+        )
+        feedbacks = [[rng.randrange(3) for _ in range(length)]] * length
+        guesses = ["W" * length] * length
+        await runner.run(
+            f"render_board/classic/{length}",
+            lambda length=length, guesses=guesses, feedbacks=feedbacks: (
+                classic.render_board(length, length + 1, guesses, feedbacks, options)
+            ),
+        )
+
+    for boards in MULTI_BOARDS:
+        await runner.run(
+            f"guess/multi/{boards}",
+            lambda boards=boards: play_multi(plugin, multi, boards, rng),
+            ops=multi.default_max_guesses(boards) - 1,
+            iterations=max(3, runner.iterations // 4),
+        )
+
+        multi_game = await play_multi(plugin, multi, boards, rng)
+        await runner.run(
+            f"render_board/multi/{boards}",
+            lambda game=multi_game: multi.render_board(
+                game.layout,
+                game.guesses,
+                game._feedbacks,
+                game.solved_at,
+                game._keyboard_status,
+                options,
+            ),
+        )
+
+        guess = multi_game.guesses[0]
+        await runner.run(
+            f"score_block/{boards}",
+            lambda game=multi_game, guess=guess: game._block.score(guess),
+        )
+
+    game = await play_multi(plugin, multi, 8, rng)
+    await runner.run("gen_text/octordle", game.gen_text)
+    classic_game = classic.WordleClassic("CRANE", game.valid_words, plugin.renderer)
+    for guess in random_words(game.valid_words, classic_game.max_attempts - 1, rng):
+        classic_game.apply_guess(guess)
+    await runner.run("gen_text/classic/5", classic_game.gen_text)
+
+    canvas = plugin.renderer.canvases.get(game._canvas_key)
+    if canvas is None:
+        canvas = multi.empty_board(game.layout)
+    for image_format in ENCODE_FORMATS:
+        format_options = encode.EncoderOptions(image_format, options.compress_level)
+        await runner.run(
+            f"encode/octordle/{image_format}",
+            lambda format_options=format_options: encode.encode_image(
+                canvas, format_options, multi.PALETTE_COLORS
+            ),
+        )
+
+
+async def drain(generator):
+    if generator is None:
+        return
+    async for _ in generator:
+        pass
+
+
+async def bench_messages(runner: Runner, plugin, modules, rng: random.Random):
+    """每轮发送一条猜测，对局结束后下一轮重新开局"""
+    session_id = "bench:group:e2e"
+    words = sorted(plugin.dictionaries.get("classic").lookup(5))
+    starters = {
+        "classic": lambda event: plugin.start_wordle(event, 5),
+        "octordle": plugin.start_octordle,
+    }
+
+    for name, start in starters.items():
+
+        async def send_guess(start=start):
+            if plugin.game_sessions.get(session_id) is None:
+                await drain(start(StubEvent("wordle start", session_id)))
+            guess = rng.choice(words).lower()
+            await drain(plugin.on_all_message(StubEvent(guess, session_id)))
+
+        await runner.run(f"on_all_message/{name}", send_guess)
+        plugin.end_session(session_id)
+
+
+SUITES = (bench_dictionaries, bench_scoring, bench_rendering, bench_messages)
+
+
+async def run_suite(args) -> dict[str, Any]:
+    stubbed = install_astrbot_stubs()
+    main = load_plugin_module("main")
+    modules = {
+        name: load_plugin_module(f"games.{name}")
+        for name in (
+            "constraints",
+            "daily",
+            "dictionary",
+            "encode",
+            "scoring",
+            "wordle_classic",
+            "wordle_multi",
+        )
+    }
+
+    config = AstrBotConfig(
+        render_mode=args.render_mode,
+        image_format=args.image_format,
+        session_persistence=False,
+        notify_on_expire=False,
+    )
+    plugin = main.PluginWordle(StubContext(), config)
+    rng = random.Random(args.seed)
+    runner = Runner(args.iterations, args.filter)
+    try:
+        for suite in SUITES:
+            await suite(runner, plugin, modules, rng)
+    finally:
+        await plugin.terminate()
+
+    numpy = modules["scoring"].np
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": numpy.__version__ if numpy is not None else None,
+            "astrbot_stubbed": stubbed,
+            "render_mode": plugin.renderer.mode,
+            "image_format": plugin.renderer.encoder.options.format,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            # Linux下单位为KB
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "results": runner.results,
+    }
+
+
+def compare(base_path: str, new_path: str, threshold: float, metric: str) -> int:
+    """按指定指标比较两次结果，变慢超过threshold视为回归，返回回归数量"""
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'benchmark':<40} {'base':>11} {'new':>11} {'change':>9}")
+    for name in sorted(base.keys() | new.keys()):
+        if name not in base or name not in new:
+            side = "base" if name in base else "new"
+            print(f"{name:<40} only in {side}")
+            continue
+        old_value, new_value = base[name][metric], new[name][metric]
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  improved"
+        print(f"{name:<40} {old_value:9.3f}ms {new_value:9.3f}ms {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="wordle插件基准测试")
+    subparsers = parser.add_subparsers(dest="command")
+
+    parser.add_argument("--out", help="结果JSON的保存路径")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--filter", help="只运行名称包含该字符串的基准")
+    parser.add_argument("--render-mode", default="sync")
+    parser.add_argument("--image-format", default="png-palette")
+    parser.add_argument("--seed", type=int, default=0)
+
+    compare_parser = subparsers.add_parser("compare", help="比较两次结果")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.add_argument("--metric", default="p50_ms")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        regressions = compare(args.base, args.new, args.threshold, args.metric)
+        sys.exit(1 if regressions else 0)
+
+    report = asyncio.run(run_suite(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
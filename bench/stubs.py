@@ -0,0 +1,181 @@
+"""不依赖AstrBot运行插件所需的最小替身
+
+只有在当前环境没有安装astrbot时才注册替身模块，
+已安装时基准测试直接使用真实的AstrBot API
+"""
+
+import importlib.util
+import logging
+import os
+import sys
+import types
+
+PLUGIN_NAME = "astrbot_plugin_wordle"
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class AstrBotConfig(dict):
+    def save_config(self):
+        pass
+
+
+class MessageChain:
+    def __init__(self, chain: list | None = None):
+        self.chain = chain or []
+
+    def message(self, text: str) -> "MessageChain":
+        self.chain.append(("text", text))
+        return self
+
+    def base64_image(self, data: str) -> "MessageChain":
+        self.chain.append(("base64_image", len(data)))
+        return self
+
+    def file_image(self, path: str) -> "MessageChain":
+        self.chain.append(("file_image", path))
+        return self
+
+
+class StubEvent:
+    """模拟一条消息事件，发送的内容记录在sent中"""
+
+    def __init__(
+        self,
+        message: str,
+        session_id: str = "bench:group:1",
+        sender_id: str = "10001",
+        sender_name: str = "bench",
+        platform: str = "bench",
+    ):
+        self.message = message
+        self.unified_msg_origin = session_id
+        self.sender_id = sender_id
+        self.sender_name = sender_name
+        self.platform = platform
+        self.is_at_or_wake_command = True
+        self.sent: list = []
+
+    def get_message_str(self) -> str:
+        return self.message
+
+    def get_platform_name(self) -> str:
+        return self.platform
+
+    def get_sender_id(self) -> str:
+        return self.sender_id
+
+    def get_sender_name(self) -> str:
+        return self.sender_name
+
+    def get_group_id(self) -> str:
+        return self.unified_msg_origin
+
+    def is_admin(self) -> bool:
+        return True
+
+    def plain_result(self, text: str):
+        return ("plain", text)
+
+    def chain_result(self, chain: list):
+        return ("chain", chain)
+
+    async def send(self, chain: MessageChain):
+        self.sent.append(chain)
+
+
+class StubContext:
+    def __init__(self):
+        self.sent: list = []
+
+    async def send_message(self, session_id: str, chain: MessageChain):
+        self.sent.append((session_id, chain))
+
+
+class _CommandGroup:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def command(self, name: str, *args, **kwargs):
+        return lambda fn: fn
+
+    def group(self, name: str, *args, **kwargs):
+        return _CommandGroup(None)
+
+
+class _Filter:
+    class PermissionType:
+        ADMIN = "admin"
+        MEMBER = "member"
+
+    @staticmethod
+    def command_group(name: str, *args, **kwargs):
+        return _CommandGroup
+
+    @staticmethod
+    def command(name: str, *args, **kwargs):
+        return lambda fn: fn
+
+    @staticmethod
+    def event_message_type(message_type, *args, **kwargs):
+        return lambda fn: fn
+
+    @staticmethod
+    def permission_type(permission_type, *args, **kwargs):
+        return lambda fn: fn
+
+
+class _Star:
+    def __init__(self, context):
+        self.context = context
+
+
+class _EventMessageType:
+    ALL = "all"
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    # 让子模块可以通过属性访问
+    module.__path__ = []
+    sys.modules[name] = module
+    return module
+
+
+def install_astrbot_stubs() -> bool:
+    """未安装astrbot时注册替身模块，返回是否使用了替身"""
+    if importlib.util.find_spec("astrbot") is not None:
+        return False
+
+    _module("astrbot")
+    _module(
+        "astrbot.api",
+        AstrBotConfig=AstrBotConfig,
+        logger=logging.getLogger("astrbot"),
+    )
+    _module("astrbot.api.event", AstrMessageEvent=StubEvent, filter=_Filter)
+    _module(
+        "astrbot.api.star",
+        Context=StubContext,
+        Star=_Star,
+        register=lambda *args, **kwargs: lambda cls: cls,
+    )
+    _module("astrbot.core")
+    _module("astrbot.core.message")
+    _module("astrbot.core.message.message_event_result", MessageChain=MessageChain)
+    _module("astrbot.core.star")
+    _module("astrbot.core.star.filter")
+    _module(
+        "astrbot.core.star.filter.event_message_type",
+        EventMessageType=_EventMessageType,
+    )
+    return True
+
+
+def load_plugin_module(name: str = "main") -> types.ModuleType:
+    """以包的形式导入插件目录下的模块，使相对导入可用"""
+    if PLUGIN_NAME not in sys.modules:
+        package = types.ModuleType(PLUGIN_NAME)
+        package.__path__ = [PLUGIN_DIR]
+        sys.modules[PLUGIN_NAME] = package
+    return importlib.import_module(f"{PLUGIN_NAME}.{name}")
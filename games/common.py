@@ -1,15 +1,73 @@
+import sys
 from abc import ABC, abstractmethod
+from collections.abc import Set as AbstractSet
+from typing import Any
+
+from .constraints import HardModeConstraints  # type: ignore
+
+
+def estimate_size(obj: Any) -> int:
+    """递归估计列表/字典等容器的内存占用"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(estimate_size(item) for item in obj)
+    return size
+
+
+def canvas_size(canvas: Any) -> int:
+    if canvas is None:
+        return 0
+    return canvas.width * canvas.height * len(canvas.getbands())
 
 
 class WordleBase(ABC):
+    # 持久化时用于区分对局类型
+    kind: str = ""
+
     @abstractmethod
     async def gen_image(self) -> bytes:
         pass
 
+    @abstractmethod
+    def gen_text(self) -> str:
+        """不渲染图片的文字棋盘"""
+
+    @abstractmethod
+    def apply_guess(self, word: str):
+        """只更新对局状态，不渲染"""
+
     @abstractmethod
     async def guess(self, word: str) -> bytes:
         pass
 
+    @abstractmethod
+    def hard_mode_violation(self, word: str) -> str | None:
+        """困难模式下返回猜测违反的约束说明，非困难模式或满足约束时返回None"""
+
+    @abstractmethod
+    def hard_mode_constraints(self) -> list[HardModeConstraints]:
+        """困难模式下每个未猜中棋盘的约束，非困难模式时为空"""
+
+    @abstractmethod
+    def to_state(self) -> dict[str, Any]:
+        """可JSON序列化的对局状态，用于持久化"""
+
+    @abstractmethod
+    def memory_usage(self) -> int:
+        """粗略估计对局自身占用的内存（字节），不含共享的词表、图块缓存和画布缓存"""
+
+    @property
+    @abstractmethod
+    def hard_mode(self) -> bool:
+        pass
+
+    @property
+    @abstractmethod
+    def dict_name(self) -> str:
+        pass
+
     @property
     @abstractmethod
     def answer(self) -> str:
@@ -17,7 +75,7 @@ class WordleBase(ABC):
 
     @property
     @abstractmethod
-    def valid_words(self) -> list[str]:
+    def valid_words(self) -> AbstractSet[str]:
         pass
 
     @property
@@ -35,6 +93,26 @@ class WordleBase(ABC):
     def guesses(self) -> list[str]:
         pass
 
+    @property
+    @abstractmethod
+    def players(self) -> dict[str, str]:
+        """参与过猜测的玩家：user_id -> 昵称"""
+
+    @property
+    @abstractmethod
+    def board_count(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def solved_count(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def open_boards(self) -> list[list[list[int]]]:
+        """每个尚未猜中的棋盘对应的历次反馈"""
+
     @property
     @abstractmethod
     def is_game_over(self):
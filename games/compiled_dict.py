@@ -0,0 +1,160 @@
+import mmap
+import os
+import random
+import struct
+import sys
+from collections.abc import Iterator
+from collections.abc import Set as AbstractSet
+
+COMPILED_SUFFIX = ".wdb"
+
+# 文件布局：
+#   头部     magic(4s) version(H) bucket_count(H) source_mtime_ns(q) source_size(q)
+#   桶索引   每个桶 length(H) reserved(H) count(I) offset(Q)
+#   数据     每个桶内按字节序排序的定长大写ASCII记录，无分隔符
+MAGIC = b"WDLB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqq")
+BUCKET_ENTRY = struct.Struct("<HHIQ")
+
+
+class CompiledBucket(AbstractSet):
+    """mmap中的一个长度分桶，按下标随机读取并用二分查找判断成员"""
+
+    def __init__(self, mm: mmap.mmap, width: int, count: int, offset: int):
+        self._mm = mm
+        self._width = width
+        self._count = count
+        self._offset = offset
+
+    def _record(self, index: int) -> bytes:
+        start = self._offset + index * self._width
+        return self._mm[start : start + self._width]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._record(index).decode("ascii")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._record(index).decode("ascii")
+
+    def sample(self, count: int) -> list[str]:
+        # 只对下标抽样，不需要把整个分桶解码成字符串
+        return [self[i] for i in random.sample(range(self._count), count)]
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str) or len(word) != self._width:
+            return False
+        try:
+            key = word.encode("ascii")
+        except UnicodeEncodeError:
+            return False
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            if record < key:
+                lo = mid + 1
+            elif record > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    # Set默认的__hash__为None，这里按身份哈希即可
+    __hash__ = object.__hash__
+
+
+class CompiledDictionary:
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self.mtime_ns = stat.st_mtime_ns
+            self.size = stat.st_size
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, bucket_count, source_mtime_ns, source_size = HEADER.unpack_from(
+            self._mm, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} 不是有效的编译词典")
+        self.source_mtime_ns = source_mtime_ns
+        self.source_size = source_size
+
+        self._buckets: dict[int, CompiledBucket] = {}
+        for i in range(bucket_count):
+            length, _, count, offset = BUCKET_ENTRY.unpack_from(
+                self._mm, HEADER.size + i * BUCKET_ENTRY.size
+            )
+            self._buckets[length] = CompiledBucket(self._mm, length, count, offset)
+
+    def bucket(self, length: int) -> CompiledBucket:
+        bucket = self._buckets.get(length)
+        if bucket is None:
+            return CompiledBucket(self._mm, length, 0, 0)
+        return bucket
+
+    def lookup(self, length: int) -> CompiledBucket:
+        return self.bucket(length)
+
+    def sample(self, length: int, count: int) -> list[str]:
+        return self.bucket(length).sample(count)
+
+
+def read_source_stamp(path: str) -> tuple[int, int]:
+    with open(path, "rb") as file:
+        magic, version, _, source_mtime_ns, source_size = HEADER.unpack(
+            file.read(HEADER.size)
+        )
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} 不是有效的编译词典")
+    return source_mtime_ns, source_size
+
+
+def compile_dictionary(source: str, target: str) -> int:
+    """把文本词典编译为定长记录文件，返回写入的单词数"""
+    stat = os.stat(source)
+    grouped: dict[int, set[bytes]] = {}
+    with open(source, "r", encoding="utf-8") as file:
+        for word in file.read().split():
+            word = word.strip().upper()
+            # 定长记录只能存放ASCII单词
+            if word and word.isascii():
+                grouped.setdefault(len(word), set()).add(word.encode("ascii"))
+
+    lengths = sorted(grouped)
+    offset = HEADER.size + BUCKET_ENTRY.size * len(lengths)
+    index = bytearray()
+    for length in lengths:
+        index += BUCKET_ENTRY.pack(length, 0, len(grouped[length]), offset)
+        offset += length * len(grouped[length])
+
+    # 先写临时文件再替换，多个进程同时编译也不会读到半成品
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(
+            HEADER.pack(MAGIC, VERSION, len(lengths), stat.st_mtime_ns, stat.st_size)
+        )
+        file.write(index)
+        for length in lengths:
+            file.write(b"".join(sorted(grouped[length])))
+    os.replace(tmp_path, target)
+    return sum(len(words) for words in grouped.values())
+
+
+if __name__ == "__main__":
+    # 用法: python games/compiled_dict.py dict/all.txt [dict/classic.txt ...]
+    for source in sys.argv[1:]:
+        target = os.path.splitext(source)[0] + COMPILED_SUFFIX
+        print(f"{source} -> {target}: {compile_dictionary(source, target)} words")
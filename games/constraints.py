@@ -0,0 +1,69 @@
+from collections.abc import Sequence
+
+from .scoring import encode_words, np  # type: ignore
+
+# A-Z占低26位，其他字符（如流式词典中的非英文字母）共用第26位
+OTHER_BIT = 26
+ALL_LETTERS = (1 << (OTHER_BIT + 1)) - 1
+
+
+def letter_bit(letter: str) -> int:
+    index = ord(letter) - ord("A")
+    return 1 << (index if 0 <= index < OTHER_BIT else OTHER_BIT)
+
+
+class HardModeConstraints:
+    """困难模式的约束：已揭示的绿色字母必须在原位置，黄色字母必须包含
+
+    由历次反馈增量维护为每个位置允许的字母位掩码和每个字母的最少出现次数，
+    检查一个猜测只需按位置查掩码和比较少量计数，与历史长度无关
+    """
+
+    def __init__(self, length: int):
+        self._allowed = [ALL_LETTERS] * length
+        self._greens: list[str | None] = [None] * length
+        self._min_counts: dict[str, int] = {}
+
+    def add(self, word: str, feedback: Sequence[int]):
+        counts: dict[str, int] = {}
+        for i, (letter, value) in enumerate(zip(word, feedback)):
+            if value == 2:
+                self._allowed[i] = letter_bit(letter)
+                self._greens[i] = letter
+            if value > 0:
+                counts[letter] = counts.get(letter, 0) + 1
+        for letter, count in counts.items():
+            if count > self._min_counts.get(letter, 0):
+                self._min_counts[letter] = count
+
+    def violation(self, word: str) -> str | None:
+        """返回不满足的约束说明，满足时返回None"""
+        for i, (letter, allowed) in enumerate(zip(word, self._allowed)):
+            if not allowed & letter_bit(letter):
+                return f"第{i + 1}个字母必须是{self._greens[i]}"
+        for letter, count in self._min_counts.items():
+            if word.count(letter) < count:
+                return (
+                    f"必须包含{count}个{letter}" if count > 1 else f"必须包含{letter}"
+                )
+        return None
+
+    def allows(self, word: str) -> bool:
+        return self.violation(word) is None
+
+    def mask(self, codes):
+        """对 N×L 的字母编码矩阵批量检查，返回长度为N的布尔数组"""
+        index = codes.astype(np.int32) - ord("A")
+        index[(index < 0) | (index >= OTHER_BIT)] = OTHER_BIT
+        allowed = np.array(self._allowed, dtype=np.int32)
+        matches = ((np.left_shift(1, index) & allowed) != 0).all(axis=1)
+        for letter, count in self._min_counts.items():
+            code = letter.encode("ascii", "replace")[0]
+            matches &= (codes == code).sum(axis=1) >= count
+        return matches
+
+    def matching(self, words: Sequence[str]) -> list[str]:
+        """words中满足全部约束的单词"""
+        if np is None or not words:
+            return [word for word in words if self.allows(word)]
+        return [words[i] for i in np.flatnonzero(self.mask(encode_words(words)))]
@@ -0,0 +1,338 @@
+import asyncio
+import random
+import time
+from array import array
+from collections.abc import Mapping
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from PIL import Image, ImageDraw
+
+from .dictionary import DictionaryRegistry  # type: ignore
+from .encode import EncodedImage, EncoderOptions, encode_image  # type: ignore
+from .metrics import METRICS  # type: ignore
+from .render import RenderExecutor  # type: ignore
+from .scoring import (  # type: ignore
+    decode_pattern,
+    encode_words,
+    np,
+    pattern_code,
+    score,
+    score_guesses,
+)
+from .wordle_multi import get_font  # type: ignore
+
+# 第0期的日期，期号为距此的天数
+EPOCH = date(2024, 1, 1)
+# 反馈编码用uint32保存，超过该长度的单词不预先计算
+MAX_TABLE_LENGTH = 20
+# 分桶超过该单词数时不预先计算整桶反馈，改为逐次评分
+MAX_TABLE_WORDS = 500_000
+# 整块评分的临时矩阵为 N×L×L，按块计算以限制内存
+TABLE_CHUNK = 8192
+
+RESULTS_WIDTH = 400
+RESULTS_MARGIN = 16
+RESULTS_ROW = 28
+BAR_LEFT = 48
+BAR_MAX = 280
+BACKGROUND_COLOR = (255, 255, 255)
+TEXT_COLOR = (0, 0, 0)
+WIN_COLOR = (106, 170, 100)
+LOSS_COLOR = (120, 124, 126)
+PALETTE_COLORS = (BACKGROUND_COLOR, TEXT_COLOR, WIN_COLOR, LOSS_COLOR)
+
+
+class DailySchedule:
+    """由一个词典分桶预先生成的答案顺序
+
+    单词去重并按字母序排列后用固定种子洗牌，第n期的答案为顺序中的第n个单词，
+    用完后循环。顺序只取决于单词集合和种子，任何实例上都相同
+    """
+
+    def __init__(self, source: Any, dict_name: str, length: int, seed: str):
+        words = tuple(sorted(set(source.bucket(length))))
+        if not words:
+            raise ValueError(f"词典 {dict_name} 中没有长度为{length}的单词")
+        self.source = source
+        self.dict_name = dict_name
+        self.length = length
+        self.words = words
+        self.valid_words: AbstractSet[str] = source.lookup(length)
+        order = list(range(len(words)))
+        random.Random(f"{seed}:{length}").shuffle(order)
+        self._order = array("I", order)
+        self._index: dict[str, int] | None = None
+        self._codes = None
+        if (
+            length <= MAX_TABLE_LENGTH
+            and len(words) <= MAX_TABLE_WORDS
+            and all(word.isascii() for word in words)
+        ):
+            self._index = {word: i for i, word in enumerate(words)}
+            if np is not None:
+                self._codes = encode_words(words)
+
+    def answer(self, number: int) -> str:
+        return self.words[self._order[number % len(self._order)]]
+
+    def feedback_codes(self, answer: str):
+        """当天答案对整桶每个单词的反馈编码，顺序与words一致，不满足条件时返回None"""
+        if self._index is None:
+            return None
+        if self._codes is None:
+            return array("I", (pattern_code(score(w, answer)) for w in self.words))
+        weights = 3 ** np.arange(self.length, dtype=np.uint32)
+        codes = np.empty(len(self.words), dtype=np.uint32)
+        for start in range(0, len(self.words), TABLE_CHUNK):
+            block = self._codes[start : start + TABLE_CHUNK]
+            feedback = score_guesses(block, answer).astype(np.uint32)
+            codes[start : start + len(block)] = feedback @ weights
+        codes.flags.writeable = False
+        return codes
+
+    def puzzle(self, day: date) -> "DailyPuzzle":
+        number = (day - EPOCH).days
+        answer = self.answer(number)
+        return DailyPuzzle(
+            day,
+            number,
+            answer,
+            self.dict_name,
+            self.valid_words,
+            self._index,
+            self.feedback_codes(answer),
+        )
+
+
+@dataclass(frozen=True)
+class DailyPuzzle:
+    """一天的题目，当天所有会话的对局共享同一个只读实例"""
+
+    day: date
+    number: int
+    answer: str
+    dict_name: str
+    valid_words: AbstractSet[str]
+    # 单词 -> codes中的下标，两者都为None时逐次评分
+    index: Mapping[str, int] | None = None
+    codes: Any = None
+
+    def feedback(self, word: str) -> list[int]:
+        if self.codes is not None:
+            i = self.index.get(word)
+            if i is not None:
+                return decode_pattern(int(self.codes[i]), len(self.answer))
+        return score(word, self.answer)
+
+
+@dataclass
+class DailyResults:
+    """当天完成每日挑战的会话汇总，每个会话只计第一次完成"""
+
+    day: date
+    number: int
+    max_attempts: int
+    played: int = 0
+    won: int = 0
+    # 猜中所用次数 -> 会话数
+    distribution: dict[int, int] = field(default_factory=dict)
+    sessions: set[str] = field(default_factory=set)
+    # 每记录一局加一，用于判断缓存的结果图片是否过期
+    version: int = 0
+
+    def record(self, session_id: str, won: bool, guesses: int) -> bool:
+        if session_id in self.sessions:
+            return False
+        self.sessions.add(session_id)
+        self.played += 1
+        if won:
+            self.won += 1
+            self.distribution[guesses] = self.distribution.get(guesses, 0) + 1
+        self.version += 1
+        return True
+
+    def rows(self) -> list[tuple[str, int]]:
+        rows = [
+            (str(guesses), self.distribution.get(guesses, 0))
+            for guesses in range(1, self.max_attempts + 1)
+        ]
+        rows.append(("X", self.played - self.won))
+        return rows
+
+    @property
+    def win_rate(self) -> float:
+        return self.won / self.played if self.played else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"每日挑战 #{self.number}（{self.day.isoformat()}）: "
+            f"{self.played}个会话完成，{self.won}个猜中（{self.win_rate:.0%}）"
+        )
+
+    def text(self) -> str:
+        lines = [self.summary()]
+        most = max((count for _, count in self.rows()), default=0)
+        for label, count in self.rows():
+            if count:
+                bar = "█" * max(1, round(count / most * 10))
+                lines.append(f"{label}: {bar} {count}")
+            else:
+                lines.append(f"{label}: 0")
+        return "\n".join(lines)
+
+
+def render_results(
+    title: str,
+    summary: str,
+    rows: list[tuple[str, int]],
+    options: EncoderOptions,
+) -> EncodedImage:
+    """绘制当天结果的柱状图，只依赖可序列化的参数以便在进程池中执行"""
+    start = time.perf_counter()
+    height = RESULTS_MARGIN * 2 + RESULTS_ROW * (len(rows) + 2)
+    image = Image.new("RGB", (RESULTS_WIDTH, height), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    draw.text(
+        (RESULTS_MARGIN, RESULTS_MARGIN), title, fill=TEXT_COLOR, font=get_font(20)
+    )
+
+    font = get_font(16)
+    draw.text(
+        (RESULTS_MARGIN, RESULTS_MARGIN + RESULTS_ROW),
+        summary,
+        fill=TEXT_COLOR,
+        font=font,
+    )
+    most = max((count for _, count in rows), default=0) or 1
+    for i, (label, count) in enumerate(rows):
+        top = RESULTS_MARGIN + RESULTS_ROW * (i + 2)
+        draw.text((RESULTS_MARGIN, top + 4), label, fill=TEXT_COLOR, font=font)
+        width = max(4, round(count / most * BAR_MAX))
+        right = RESULTS_MARGIN + BAR_LEFT + width
+        draw.rectangle(
+            (RESULTS_MARGIN + BAR_LEFT, top + 2, right, top + RESULTS_ROW - 4),
+            fill=LOSS_COLOR if label == "X" else WIN_COLOR,
+        )
+        draw.text((right + 6, top + 4), str(count), fill=TEXT_COLOR, font=font)
+    return encode_image(image, options, PALETTE_COLORS, time.perf_counter() - start)
+
+
+@dataclass
+class ResultsImage:
+    day: date
+    version: int
+    rendered_at: float
+    data: bytes
+
+
+class DailyChallenge:
+    """每日挑战：当天所有会话使用同一个答案
+
+    答案顺序按(词典, 长度)生成一次，换日时只取出当天的答案并为它计算一次整桶反馈，
+    开局不再读取词典。结束的对局汇总为当天结果，结果图片只绘制一份供所有会话发送，
+    结果变化且距上次绘制超过refresh秒时才重新绘制
+    """
+
+    def __init__(
+        self,
+        dictionaries: DictionaryRegistry,
+        length: int = 5,
+        utc_offset: float = 8,
+        seed: str = "wordle",
+        refresh: float = 60,
+    ):
+        self._dictionaries = dictionaries
+        self._length = length
+        self._utc_offset = timedelta(hours=utc_offset)
+        self._seed = seed
+        self._refresh = refresh
+        self._schedule: DailySchedule | None = None
+        self._puzzle: DailyPuzzle | None = None
+        self._results: DailyResults | None = None
+        self._image: ResultsImage | None = None
+        self._lock = asyncio.Lock()
+        self._image_lock = asyncio.Lock()
+
+    def today(self) -> date:
+        return (datetime.now(timezone.utc) + self._utc_offset).date()  # noqa: UP017
+
+    def _current(self, dict_name: str) -> DailyPuzzle | None:
+        puzzle = self._puzzle
+        if puzzle is None or puzzle.day != self.today():
+            return None
+        return puzzle if puzzle.dict_name == dict_name else None
+
+    async def puzzle(self, dict_name: str) -> DailyPuzzle:
+        """当天的题目，同一天内直接返回缓存，换日或换词典时只生成一次"""
+        puzzle = self._current(dict_name)
+        if puzzle is not None:
+            return puzzle
+        async with self._lock:
+            puzzle = self._current(dict_name)
+            if puzzle is None:
+                with METRICS.timer("daily"):
+                    puzzle = await asyncio.to_thread(
+                        self._build, dict_name, self.today()
+                    )
+                self._puzzle = puzzle
+            return puzzle
+
+    def _build(self, dict_name: str, day: date) -> DailyPuzzle:
+        loaded = self._dictionaries.get(dict_name)
+        schedule = self._schedule
+        if (
+            schedule is None
+            or schedule.source is not loaded
+            or schedule.dict_name != dict_name
+        ):
+            # 词典文件变化或被卸载后重新加载时重新生成，同样的单词得到同样的顺序
+            schedule = DailySchedule(loaded, dict_name, self._length, self._seed)
+            self._schedule = schedule
+        return schedule.puzzle(day)
+
+    def results(self) -> DailyResults | None:
+        results = self._results
+        if results is None or results.day != self.today():
+            return None
+        return results
+
+    def completed(self, session_id: str) -> bool:
+        results = self.results()
+        return results is not None and session_id in results.sessions
+
+    def record(self, session_id: str, game: Any) -> bool:
+        """记录一局结束的每日挑战（WordleDaily），跨日才结束的前一天对局不计入"""
+        if game.day != self.today():
+            return False
+        results = self.results()
+        if results is None:
+            results = DailyResults(game.day, game.number, game.max_attempts)
+            self._results = results
+        return results.record(session_id, bool(game.is_won), len(game.guesses))
+
+    async def results_image(self, renderer: RenderExecutor) -> bytes | None:
+        """所有会话共享的当天结果图片，同一时刻只绘制一次"""
+        async with self._image_lock:
+            results = self.results()
+            if results is None:
+                return None
+            cached = self._image
+            if cached is not None and cached.day == results.day:
+                fresh = cached.version == results.version
+                if fresh or time.monotonic() - cached.rendered_at < self._refresh:
+                    return cached.data
+
+            version = results.version
+            data = await renderer.render(
+                render_results,
+                f"Daily Wordle #{results.number}  {results.day.isoformat()}",
+                f"{results.played} played, {results.won} solved "
+                f"({results.win_rate:.0%})",
+                results.rows(),
+            )
+            self._image = ResultsImage(results.day, version, time.monotonic(), data)
+            METRICS.incr("daily_results_rendered")
+            return data
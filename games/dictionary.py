@@ -0,0 +1,235 @@
+import os
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .compiled_dict import (  # type: ignore
+    COMPILED_SUFFIX,
+    CompiledDictionary,
+    compile_dictionary,
+    read_source_stamp,
+)
+from .streaming_dict import INDEX_SUFFIX, StreamingDictionary  # type: ignore
+
+DICT_SUFFIX = ".txt"
+
+
+@dataclass
+class LoadedDictionary:
+    name: str
+    path: str
+    mtime_ns: int
+    size: int
+    buckets: dict[int, tuple[str, ...]] = field(default_factory=dict)
+    lookups: dict[int, frozenset[str]] = field(default_factory=dict)
+
+    def bucket(self, length: int) -> tuple[str, ...]:
+        return self.buckets.get(length, ())
+
+    def lookup(self, length: int) -> frozenset[str]:
+        """同一词典同一长度的所有对局共享这一个只读集合"""
+        return self.lookups.get(length, frozenset())
+
+    def sample(self, length: int, count: int) -> list[str]:
+        return random.sample(self.bucket(length), count)
+
+
+def parse_dictionary(name: str, path: str) -> LoadedDictionary:
+    stat = os.stat(path)
+    grouped: dict[int, dict[str, None]] = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for word in file.read().split():
+            word = word.strip().upper()
+            if word:
+                # 用dict去重并保持原有顺序
+                grouped.setdefault(len(word), {})[word] = None
+
+    buckets = {length: tuple(words) for length, words in grouped.items()}
+    return LoadedDictionary(
+        name=name,
+        path=path,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        buckets=buckets,
+        lookups={length: frozenset(words) for length, words in buckets.items()},
+    )
+
+
+def _stat(path: str) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+class DictionaryRegistry:
+    """进程内词典缓存，每个词典只解析一次并按单词长度分桶
+
+    同名的.wdb编译词典与.txt源文件一致（或没有源文件）时优先使用编译词典，
+    编译词典通过mmap打开，多个进程共享系统页缓存；
+    超过stream_threshold字节的txt词典不读入内存，改为流式抽取答案并用布隆过滤器校验。
+    对局通过acquire/release引用词典，没有对局引用且超过max_idle秒
+    未被使用的词典会被卸载，下次使用时重新加载
+    """
+
+    def __init__(
+        self, folder: str, max_idle: float = 600, stream_threshold: int = 64 << 20
+    ):
+        self._folder = folder
+        self._max_idle = max_idle
+        self._stream_threshold = stream_threshold
+        self._loaded: dict[
+            str, LoadedDictionary | CompiledDictionary | StreamingDictionary
+        ] = {}
+        self._refs: dict[str, int] = {}
+        self._last_used: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+
+    def _load_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(name, threading.Lock())
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    def path(self, name: str) -> str:
+        return os.path.join(self._folder, f"{name}{DICT_SUFFIX}")
+
+    @property
+    def cache_folder(self) -> str:
+        return os.path.join(self._folder, "cache")
+
+    def compiled_path(self, name: str) -> str:
+        return os.path.join(self._folder, f"{name}{COMPILED_SUFFIX}")
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self.path(name)) or os.path.isfile(
+            self.compiled_path(name)
+        )
+
+    def names(self) -> list[str]:
+        return sorted(
+            {
+                os.path.splitext(f)[0]
+                for f in os.listdir(self._folder)
+                if f.endswith((DICT_SUFFIX, COMPILED_SUFFIX))
+            }
+        )
+
+    def index_path(self, name: str) -> str:
+        return os.path.join(self.cache_folder, f"{name}{INDEX_SUFFIX}")
+
+    def is_compiled(self, name: str) -> bool:
+        return self._resolve(name) == self.compiled_path(name)
+
+    def _resolve(self, name: str) -> str:
+        text_path = self.path(name)
+        compiled_path = self.compiled_path(name)
+        if not os.path.isfile(compiled_path):
+            return text_path
+
+        text_stat = _stat(text_path)
+        if text_stat is None:
+            return compiled_path
+        try:
+            stamp = read_source_stamp(compiled_path)
+        except (OSError, ValueError, struct.error):
+            return text_path
+        if stamp == (text_stat.st_mtime_ns, text_stat.st_size):
+            return compiled_path
+        return text_path
+
+    def is_fresh(self, name: str) -> bool:
+        loaded = self._loaded.get(name)
+        if loaded is None:
+            return False
+        stat = _stat(loaded.path)
+        if stat is None or (stat.st_mtime_ns, stat.st_size) != (
+            loaded.mtime_ns,
+            loaded.size,
+        ):
+            return False
+
+        if isinstance(loaded, CompiledDictionary):
+            text_stat = _stat(self.path(name))
+            return text_stat is None or (text_stat.st_mtime_ns, text_stat.st_size) == (
+                loaded.source_mtime_ns,
+                loaded.source_size,
+            )
+        # 文本词典：出现了与之匹配的编译词典时切换过去
+        return self._resolve(name) == loaded.path
+
+    def get(
+        self, name: str
+    ) -> LoadedDictionary | CompiledDictionary | StreamingDictionary:
+        """返回已加载的词典，文件的mtime或大小变化时重新加载"""
+        self._last_used[name] = time.monotonic()
+        if self.is_fresh(name):
+            return self._loaded[name]
+
+        # 按词典名加锁，加载大词典时不阻塞其他词典
+        with self._load_lock(name):
+            # 等锁期间可能已被其他线程加载
+            if self.is_fresh(name):
+                return self._loaded[name]
+            path = self._resolve(name)
+            if path == self.compiled_path(name):
+                loaded = CompiledDictionary(name, path)
+            elif os.path.getsize(path) >= self._stream_threshold > 0:
+                loaded = StreamingDictionary(name, path, self.index_path(name))
+            else:
+                loaded = parse_dictionary(name, path)
+            with self._lock:
+                self._loaded[name] = loaded
+                self._last_used[name] = time.monotonic()
+        # 加载新词典时顺便卸载空闲的词典
+        self.unload_idle()
+        return loaded
+
+    def acquire(self, name: str):
+        """对局开始时登记对词典的引用，引用期间词典不会被卸载"""
+        with self._lock:
+            self._refs[name] = self._refs.get(name, 0) + 1
+            self._last_used[name] = time.monotonic()
+
+    def release(self, name: str):
+        with self._lock:
+            refs = self._refs.get(name, 0) - 1
+            if refs > 0:
+                self._refs[name] = refs
+            else:
+                self._refs.pop(name, None)
+            self._last_used[name] = time.monotonic()
+        self.unload_idle()
+
+    def references(self, name: str) -> int:
+        return self._refs.get(name, 0)
+
+    def loaded_names(self) -> list[str]:
+        return sorted(self._loaded)
+
+    def unload_idle(self) -> list[str]:
+        """卸载没有引用且空闲超过max_idle秒的词典，返回被卸载的词典名"""
+        if self._max_idle <= 0:
+            return []
+        deadline = time.monotonic() - self._max_idle
+        with self._lock:
+            idle = [
+                name
+                for name in self._loaded
+                if name not in self._refs and self._last_used.get(name, 0) < deadline
+            ]
+            for name in idle:
+                del self._loaded[name]
+                self._last_used.pop(name, None)
+        return idle
+
+    def compile(self, name: str) -> int:
+        """由.txt源文件生成.wdb编译词典，并切换到编译词典"""
+        count = compile_dictionary(self.path(name), self.compiled_path(name))
+        self.get(name)
+        return count
@@ -0,0 +1,146 @@
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image
+
+IMAGE_FORMATS = ("png", "png-palette", "webp")
+FORMAT_SUFFIXES = {"png": ".png", "png-palette": ".png", "webp": ".webp"}
+
+# 调色板中相邻过渡色的最小通道差。Pillow映射调色板时按低精度查找最近色，
+# 过渡色与纯色靠得太近会使纯色被映射为过渡色
+BLEND_SPACING = 16
+MAX_BLEND_STEPS = 8
+
+
+@dataclass(frozen=True)
+class EncoderOptions:
+    format: str = "png-palette"
+    # PNG为zlib压缩等级0-9，WebP为method 0-6（超过6按6处理）
+    compress_level: int = 6
+    # 缩放比例，1为原尺寸
+    scale: float = 1.0
+
+    def __post_init__(self):
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(f"未知的图片格式: {self.format}")
+        if not 0 < self.scale <= 1:
+            raise ValueError(f"缩放比例应在(0, 1]之间: {self.scale}")
+        if not 0 <= self.compress_level <= 9:
+            raise ValueError(f"压缩等级应在0-9之间: {self.compress_level}")
+
+    @property
+    def suffix(self) -> str:
+        return FORMAT_SUFFIXES[self.format]
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    data: bytes
+    format: str
+    encode_time: float
+    draw_time: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+@lru_cache(maxsize=8)
+def fixed_palette(base_colors: tuple[tuple[int, int, int], ...]) -> Image.Image:
+    """由棋盘用到的纯色及两两之间的过渡色组成的固定调色板"""
+    colors = list(dict.fromkeys(base_colors))
+    for i, fg in enumerate(base_colors):
+        for bg in base_colors[i + 1 :]:
+            distance = max(abs(f - b) for f, b in zip(fg, bg))
+            steps = min(MAX_BLEND_STEPS, distance // BLEND_SPACING)
+            for step in range(1, steps):
+                ratio = step / steps
+                colors.append(
+                    tuple(round(f * ratio + b * (1 - ratio)) for f, b in zip(fg, bg))
+                )
+    colors = list(dict.fromkeys(colors))[:256]
+
+    palette = Image.new("P", (1, 1))
+    flat = [channel for color in colors for channel in color]
+    palette.putpalette(flat + flat[:3] * (256 - len(colors)))
+    return palette
+
+
+def encode_image(
+    image: Image.Image,
+    options: EncoderOptions,
+    base_colors: tuple[tuple[int, int, int], ...],
+    draw_time: float = 0.0,
+) -> EncodedImage:
+    """draw_time为调用方绘制画布的耗时，随结果一并返回"""
+    start = time.perf_counter()
+    if options.scale < 1:
+        factor = round(1 / options.scale)
+        if abs(factor * options.scale - 1) < 1e-6:
+            # 整数倍缩小使用reduce，比resize快得多
+            image = image.reduce(factor)
+        else:
+            size = (
+                round(image.width * options.scale),
+                round(image.height * options.scale),
+            )
+            image = image.resize(size, Image.Resampling.BILINEAR)
+
+    with BytesIO() as output:
+        if options.format == "webp":
+            image.save(
+                output,
+                format="WEBP",
+                lossless=True,
+                method=min(options.compress_level, 6),
+            )
+        elif options.format == "png-palette":
+            image.quantize(
+                palette=fixed_palette(base_colors), dither=Image.Dither.NONE
+            ).save(output, format="PNG", compress_level=options.compress_level)
+        else:
+            image.save(output, format="PNG", compress_level=options.compress_level)
+        data = output.getvalue()
+
+    return EncodedImage(data, options.format, time.perf_counter() - start, draw_time)
+
+
+@dataclass
+class FormatStats:
+    count: int = 0
+    total_bytes: int = 0
+    total_time: float = 0.0
+
+    @property
+    def avg_bytes(self) -> float:
+        return self.total_bytes / self.count if self.count else 0.0
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+
+@dataclass
+class ImageEncoder:
+    """持有编码参数并统计各格式的编码体积与耗时"""
+
+    options: EncoderOptions = EncoderOptions()
+    stats: dict[str, FormatStats] = field(default_factory=dict)
+
+    def record(self, encoded: EncodedImage):
+        stats = self.stats.setdefault(encoded.format, FormatStats())
+        stats.count += 1
+        stats.total_bytes += encoded.size
+        stats.total_time += encoded.encode_time
+
+    def summary(self) -> str:
+        lines = []
+        for image_format, stats in self.stats.items():
+            lines.append(
+                f"{image_format}: {stats.count}张, "
+                f"平均{stats.avg_bytes / 1024:.1f}KB, "
+                f"平均编码{stats.avg_time * 1000:.1f}ms"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from .common import WordleBase  # type: ignore
+
+
+@dataclass
+class PendingGuess:
+    word: str
+    sender: str
+    sender_id: str
+    # 提交时校验所依据的对局，处理时对局已更换则丢弃
+    game: WordleBase
+
+
+class GuessQueue:
+    """按会话排队的猜测
+
+    同一会话同一时间只有一个消息处理协程（首个提交者）负责出队。
+    第一个猜测立即处理，上一批渲染、发送期间到达的猜测合并为下一批，
+    每批只渲染和发送一次；window大于0时，合并前再等待window秒收集同一波猜测
+    """
+
+    def __init__(self, window: float = 0):
+        self._window = window
+        self._pending: dict[str, list[PendingGuess]] = {}
+        self._draining: set[str] = set()
+
+    def submit(self, session_id: str, guess: PendingGuess) -> bool:
+        """加入队列，返回调用方是否需要负责处理该会话的队列"""
+        self._pending.setdefault(session_id, []).append(guess)
+        if session_id in self._draining:
+            return False
+        self._draining.add(session_id)
+        return True
+
+    def pending(self, session_id: str) -> int:
+        return len(self._pending.get(session_id, ()))
+
+    async def batches(self, session_id: str) -> AsyncIterator[list[PendingGuess]]:
+        """按提交顺序逐批取出猜测，队列为空时结束
+
+        调用方需用contextlib.aclosing包裹，处理某一批时出错也能立即释放该会话；
+        此时已排队的猜测一并丢弃，之后的猜测由新的提交者处理
+        """
+        first = True
+        try:
+            while True:
+                # 只有处理上一批期间又有猜测到达时才等待，空闲会话的猜测没有额外延迟
+                if not first and self._window > 0:
+                    await asyncio.sleep(self._window)
+                first = False
+                batch = self._pending.pop(session_id, [])
+                if not batch:
+                    return
+                yield batch
+        except GeneratorExit:
+            self._pending.pop(session_id, None)
+            raise
+        finally:
+            self._draining.discard(session_id)
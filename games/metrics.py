@@ -0,0 +1,166 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+
+# 每个阶段保留最近的样本数，分位数按这些样本计算
+WINDOW_SIZE = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+STAGE_NAMES = {
+    "message": "消息处理",
+    "dict_load": "词表加载",
+    "daily": "每日题目生成",
+    "validate": "输入校验",
+    "score": "评分",
+    "render_wait": "渲染排队",
+    "draw": "绘制",
+    "encode": "编码",
+    "text": "文字棋盘",
+    "file_io": "临时文件",
+    "send": "发送",
+}
+
+
+class RollingHistogram:
+    """最近WINDOW_SIZE个样本的分位数，以及全部样本的累计次数和总和"""
+
+    def __init__(self, window: int = WINDOW_SIZE):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self, quantiles=QUANTILES) -> list[float]:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return [0.0] * len(quantiles)
+        return [
+            ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in quantiles
+        ]
+
+
+class Metrics:
+    """各阶段耗时直方图与计数器，开销只有一次计时和一次追加"""
+
+    def __init__(self):
+        self._histograms: dict[str, RollingHistogram] = {}
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._exporter: asyncio.Task | None = None
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = RollingHistogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def incr(self, counter: str, value: int = 1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def counter(self, counter: str) -> int:
+        return self._counters.get(counter, 0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> tuple[dict[str, tuple[int, float, list[float]]], dict]:
+        with self._lock:
+            histograms = {
+                stage: (histogram.count, histogram.total, histogram.quantiles())
+                for stage, histogram in self._histograms.items()
+            }
+            counters = dict(self._counters)
+        return histograms, counters
+
+    def summary(self, gauges: dict[str, float] | None = None) -> str:
+        histograms, counters = self.snapshot()
+        lines = ["阶段耗时(ms) p50/p95/p99 (次数):"]
+        for stage, (count, _, values) in histograms.items():
+            name = STAGE_NAMES.get(stage, stage)
+            quantiles = "/".join(f"{value * 1000:.2f}" for value in values)
+            lines.append(f"- {name}: {quantiles} ({count})")
+        if counters or gauges:
+            lines.append("计数:")
+        for name, value in {**counters, **(gauges or {})}.items():
+            lines.append(f"- {name}: {value}")
+        return "\n".join(lines)
+
+    def prometheus(self, gauges: dict[str, float] | None = None) -> str:
+        histograms, counters = self.snapshot()
+        lines = ["# TYPE wordle_stage_seconds summary"]
+        for stage, (count, total, values) in histograms.items():
+            for quantile, value in zip(QUANTILES, values):
+                lines.append(
+                    f'wordle_stage_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                    f"{value:.6f}"
+                )
+            lines.append(f'wordle_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'wordle_stage_seconds_count{{stage="{stage}"}} {count}')
+        for name, value in counters.items():
+            lines.append(f"# TYPE wordle_{name}_total counter")
+            lines.append(f"wordle_{name}_total {value}")
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE wordle_{name} gauge")
+            lines.append(f"wordle_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, gauges: dict[str, float] | None = None):
+        """原子地写入Prometheus文本格式，供node_exporter的textfile收集器读取"""
+        text = self.prometheus(gauges)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    async def _export_loop(
+        self,
+        path: str,
+        interval: float,
+        gauges: Callable[[], dict[str, float]],
+    ):
+        while True:
+            await asyncio.sleep(interval)
+            # 写入失败（如目录无权限）不影响游戏，下个周期重试
+            with suppress(OSError):
+                await asyncio.to_thread(self.write_prometheus, path, gauges())
+
+    def start_exporter(
+        self,
+        path: str,
+        interval: float,
+        gauges: Callable[[], dict[str, float]],
+    ):
+        if self._exporter is None or self._exporter.done():
+            self._exporter = asyncio.create_task(
+                self._export_loop(path, interval, gauges)
+            )
+
+    def stop_exporter(self):
+        if self._exporter is not None:
+            self._exporter.cancel()
+            self._exporter = None
+
+
+# 进程内共享的指标，进程池中的渲染耗时随EncodedImage带回主进程记录
+METRICS = Metrics()
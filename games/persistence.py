@@ -0,0 +1,144 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections.abc import Callable
+from typing import Any
+
+from .common import WordleBase  # type: ignore
+from .write_behind import WriteBehindStore  # type: ignore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class SessionPersistence(WriteBehindStore):
+    """把进行中的对局写入SQLite，重启后按需恢复
+
+    保存只记录到待写队列，由后台任务批量写入；
+    启动时只读取会话ID，具体对局在该会话下次发言时才加载
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 2.0,
+        on_error: Callable[[Exception], None] | None = None,
+    ):
+        super().__init__(path, flush_interval, on_error)
+        # session_id -> 待写入的状态，None表示待删除
+        self._pending: dict[str, tuple[dict[str, Any], float] | None] = {}
+        # 正在写入的批次，写入完成前仍以它为准
+        self._writing: dict[str, tuple[dict[str, Any], float] | None] = {}
+        self._created: dict[str, float] = {}
+        self._stored_ids: set[str] = set()
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute(SCHEMA)
+
+    def open(self, max_age: float = 0):
+        """建表、清理超过max_age秒未活跃的记录并读取已保存的会话ID"""
+        with self._db_lock:
+            conn = self._connect()
+            if max_age > 0:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM sessions WHERE updated_at < ?",
+                        (time.time() - max_age,),
+                    )
+            rows = conn.execute("SELECT session_id FROM sessions")
+            self._stored_ids = {row[0] for row in rows}
+
+    def _unwritten(self, session_id: str):
+        for queue in (self._pending, self._writing):
+            if session_id in queue:
+                return True, queue[session_id]
+        return False, None
+
+    def has(self, session_id: str) -> bool:
+        found, item = self._unwritten(session_id)
+        if found:
+            return item is not None
+        return session_id in self._stored_ids
+
+    def save(self, session_id: str, game: WordleBase):
+        now = time.time()
+        self._created.setdefault(session_id, now)
+        self._pending[session_id] = (game.to_state(), now)
+        self.start_flusher()
+
+    def delete(self, session_id: str):
+        self._created.pop(session_id, None)
+        if self._unwritten(session_id)[0] or session_id in self._stored_ids:
+            self._pending[session_id] = None
+            self.start_flusher()
+
+    def _load(self, session_id: str) -> tuple[dict[str, Any], float] | None:
+        with self._db_lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT state, created_at, updated_at FROM sessions "
+                    "WHERE session_id = ?",
+                    (session_id,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        self._created.setdefault(session_id, row[1])
+        return json.loads(row[0]), row[2]
+
+    async def load(self, session_id: str) -> tuple[dict[str, Any], float] | None:
+        """返回(对局状态, 最后活跃时间)"""
+        found, item = self._unwritten(session_id)
+        if found:
+            return item
+        if session_id not in self._stored_ids:
+            return None
+        return await asyncio.to_thread(self._load, session_id)
+
+    def _write(self, batch: dict[str, tuple[dict[str, Any], float] | None]):
+        upserts = []
+        deletes = []
+        for session_id, item in batch.items():
+            if item is None:
+                deletes.append((session_id,))
+                continue
+            state, updated_at = item
+            created_at = self._created.get(session_id, updated_at)
+            upserts.append((session_id, json.dumps(state), created_at, updated_at))
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sessions "
+                    "(session_id, state, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    upserts,
+                )
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", deletes)
+        for session_id, item in batch.items():
+            if item is None:
+                self._stored_ids.discard(session_id)
+            else:
+                self._stored_ids.add(session_id)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._writing = batch
+        try:
+            await self._write_batch(self._write, batch, self._requeue)
+        finally:
+            self._writing = {}
+
+    def _requeue(self, batch: dict[str, tuple[dict[str, Any], float] | None]):
+        # 写入期间产生的新状态优先
+        self._pending = {**batch, **self._pending}
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from .write_behind import WriteBehindStore  # type: ignore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_stats (
+    scope TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    played INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    current_streak INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL,
+    distribution TEXT NOT NULL,
+    multi_played INTEGER NOT NULL,
+    boards_played INTEGER NOT NULL,
+    boards_solved INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (scope, user_id)
+)
+"""
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS player_stats_won ON player_stats (scope, won)",
+    "CREATE INDEX IF NOT EXISTS player_stats_streak ON player_stats "
+    + "(scope, best_streak)",
+)
+
+# 跨会话的个人统计使用空scope，会话整体统计使用空user_id
+GLOBAL_SCOPE = ""
+SESSION_TOTAL = ""
+
+RANK_ORDERS = {
+    "wins": "won DESC, played ASC",
+    "rate": "CAST(won AS REAL) / played DESC, won DESC",
+    "streak": "best_streak DESC, won DESC",
+}
+RANK_NAMES = {"wins": "胜场", "rate": "胜率", "streak": "最长连胜"}
+# 按胜率排行时至少需要的对局数
+MIN_RATE_GAMES = 5
+ROW_CACHE_SIZE = 4096
+
+COLUMNS = (
+    "name, played, won, current_streak, best_streak, distribution, "
+    "multi_played, boards_played, boards_solved"
+)
+
+
+@dataclass
+class GameRecord:
+    """一局结束的对局，参与过猜测的玩家都计入"""
+
+    scope: str
+    # user_id -> 昵称
+    players: dict[str, str]
+    won: bool
+    guesses: int
+    boards: int
+    boards_solved: int
+
+
+@dataclass
+class StatsRow:
+    name: str = ""
+    played: int = 0
+    won: int = 0
+    current_streak: int = 0
+    best_streak: int = 0
+    # 单棋盘获胜时用的猜测次数 -> 局数
+    distribution: dict[int, int] = field(default_factory=dict)
+    multi_played: int = 0
+    boards_played: int = 0
+    boards_solved: int = 0
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "StatsRow":
+        distribution = {int(k): v for k, v in json.loads(row[5]).items()}
+        return cls(row[0], *row[1:5], distribution, *row[6:9])
+
+    def to_row(self) -> tuple:
+        return (
+            self.name,
+            self.played,
+            self.won,
+            self.current_streak,
+            self.best_streak,
+            json.dumps(self.distribution),
+            self.multi_played,
+            self.boards_played,
+            self.boards_solved,
+        )
+
+    def apply(self, record: GameRecord, name: str):
+        self.name = name
+        self.played += 1
+        if record.won:
+            self.won += 1
+            self.current_streak += 1
+            self.best_streak = max(self.best_streak, self.current_streak)
+            if record.boards == 1:
+                self.distribution[record.guesses] = (
+                    self.distribution.get(record.guesses, 0) + 1
+                )
+        else:
+            self.current_streak = 0
+        if record.boards > 1:
+            self.multi_played += 1
+            self.boards_played += record.boards
+            self.boards_solved += record.boards_solved
+
+    @property
+    def win_rate(self) -> float:
+        return self.won / self.played if self.played else 0.0
+
+    @property
+    def completion(self) -> float:
+        """多棋盘对局中猜中的棋盘比例"""
+        return self.boards_solved / self.boards_played if self.boards_played else 0.0
+
+
+class PlayerStatsStore(WriteBehindStore):
+    """玩家与会话的战绩，SQLite中只保存预先聚合的计数
+
+    对局结束时只把结果加入待写队列，由后台任务按批在一个事务中合并进聚合行；
+    查询读取聚合行，并缓存最近读取的行和各会话的排行榜，写入后使对应缓存失效
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 5.0,
+        on_error: Callable[[Exception], None] | None = None,
+    ):
+        super().__init__(path, flush_interval, on_error)
+        self._pending: list[GameRecord] = []
+        self._rows: OrderedDict[tuple[str, str], StatsRow | None] = OrderedDict()
+        self._ranks: dict[tuple[str, str, int], list[tuple[str, StatsRow]]] = {}
+        # 批次按结束顺序合并（连胜依赖顺序），读取数据库时不穿插写入，缓存不会被旧数据覆盖
+        self._lock = asyncio.Lock()
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute(SCHEMA)
+        for index in INDEXES:
+            conn.execute(index)
+
+    def record(self, record: GameRecord):
+        if record.players:
+            self._pending.append(record)
+            self.start_flusher()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @staticmethod
+    def _targets(record: GameRecord):
+        """一局对应的聚合行：每位玩家的全局行和会话内行，以及会话整体行"""
+        for user_id, name in record.players.items():
+            yield (GLOBAL_SCOPE, user_id), name
+            yield (record.scope, user_id), name
+        yield (record.scope, SESSION_TOTAL), ""
+
+    def _select(self, conn: sqlite3.Connection, key: tuple[str, str]):
+        row = conn.execute(
+            f"SELECT {COLUMNS} FROM player_stats WHERE scope = ? AND user_id = ?",
+            key,
+        ).fetchone()
+        return StatsRow.from_row(row) if row is not None else None
+
+    def _write(self, records: list[GameRecord]) -> dict[tuple[str, str], StatsRow]:
+        with self._db_lock:
+            conn = self._connect()
+            touched: dict[tuple[str, str], StatsRow] = {}
+            for record in records:
+                for key, name in self._targets(record):
+                    row = touched.get(key)
+                    if row is None:
+                        row = self._select(conn, key) or StatsRow()
+                        touched[key] = row
+                    row.apply(record, name)
+
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO player_stats (scope, user_id, {COLUMNS}, "
+                    "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(*key, *row.to_row(), now) for key, row in touched.items()],
+                )
+        return touched
+
+    async def flush(self):
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        touched = await self._write_batch(self._write, batch, self._requeue)
+        if touched is None:
+            return
+
+        for key, row in touched.items():
+            self._cache_row(key, row)
+        scopes = {key[0] for key in touched}
+        for rank_key in [k for k in self._ranks if k[0] in scopes]:
+            del self._ranks[rank_key]
+
+    def _requeue(self, batch: list[GameRecord]):
+        self._pending = batch + self._pending
+
+    def _cache_row(self, key: tuple[str, str], row: StatsRow | None):
+        self._rows[key] = row
+        self._rows.move_to_end(key)
+        while len(self._rows) > ROW_CACHE_SIZE:
+            self._rows.popitem(last=False)
+
+    def _read(self, key: tuple[str, str]) -> StatsRow | None:
+        with self._db_lock:
+            return self._select(self._connect(), key)
+
+    async def get(self, scope: str, user_id: str) -> StatsRow | None:
+        """读取聚合行，先写入尚未落盘的对局以保证刚结束的对局可见"""
+        async with self._lock:
+            await self._flush()
+            key = (scope, user_id)
+            if key in self._rows:
+                self._rows.move_to_end(key)
+                return self._rows[key]
+            row = await asyncio.to_thread(self._read, key)
+            self._cache_row(key, row)
+            return row
+
+    def _read_rank(
+        self, scope: str, order: str, limit: int
+    ) -> list[tuple[str, StatsRow]]:
+        min_played = MIN_RATE_GAMES if order == "rate" else 1
+        with self._db_lock:
+            rows = self._connect().execute(
+                f"SELECT user_id, {COLUMNS} FROM player_stats "
+                "WHERE scope = ? AND user_id != ? AND played >= ? "
+                f"ORDER BY {RANK_ORDERS[order]} LIMIT ?",
+                (scope, SESSION_TOTAL, min_played, limit),
+            )
+            return [(row[0], StatsRow.from_row(row[1:])) for row in rows]
+
+    async def leaderboard(
+        self, scope: str, order: str = "wins", limit: int = 10
+    ) -> list[tuple[str, StatsRow]]:
+        """返回[(user_id, 统计)]，order为RANK_ORDERS中的一种"""
+        if order not in RANK_ORDERS:
+            raise ValueError(f"未知的排行方式: {order}")
+        async with self._lock:
+            await self._flush()
+            rank_key = (scope, order, limit)
+            cached = self._ranks.get(rank_key)
+            if cached is None:
+                cached = await asyncio.to_thread(self._read_rank, scope, order, limit)
+                self._ranks[rank_key] = cached
+            return cached
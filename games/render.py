@@ -0,0 +1,156 @@
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from .common import canvas_size  # type: ignore
+from .encode import EncodedImage, ImageEncoder  # type: ignore
+from .metrics import METRICS  # type: ignore
+
+RENDER_MODES = ("sync", "thread", "process")
+# 常驻画布的默认总字节数，约为9张Octordle画布或160张经典棋盘画布
+DEFAULT_CANVAS_BUDGET = 64 << 20
+
+
+class CanvasCache:
+    """各对局增量绘制用的画布，按最近使用淘汰，总字节数不超过budget
+
+    对局只持有键，画布被淘汰后下次渲染时从空白模板重新绘制全部行，
+    只影响那一次的绘制耗时；budget为0时不保留画布
+    """
+
+    def __init__(self, budget: int = DEFAULT_CANVAS_BUDGET):
+        self._budget = max(0, budget)
+        self._canvases: OrderedDict[int, Any] = OrderedDict()
+        self._size = 0
+        self._keys = itertools.count()
+        self._lock = threading.Lock()
+
+    def new_key(self) -> int:
+        return next(self._keys)
+
+    def get(self, key: int) -> Any:
+        with self._lock:
+            canvas = self._canvases.get(key)
+            if canvas is not None:
+                self._canvases.move_to_end(key)
+            return canvas
+
+    def put(self, key: int, canvas: Any):
+        size = canvas_size(canvas)
+        with self._lock:
+            old = self._canvases.pop(key, None)
+            if old is not None:
+                self._size -= canvas_size(old)
+            if size > self._budget:
+                return
+            while self._canvases and self._size + size > self._budget:
+                _, evicted = self._canvases.popitem(last=False)
+                self._size -= canvas_size(evicted)
+                METRICS.incr("canvases_evicted")
+            self._canvases[key] = canvas
+            self._size += size
+
+    def discard(self, key: int):
+        with self._lock:
+            canvas = self._canvases.pop(key, None)
+            if canvas is not None:
+                self._size -= canvas_size(canvas)
+
+    def __len__(self) -> int:
+        return len(self._canvases)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+class RenderExecutor:
+    """棋盘渲染执行器
+
+    sync模式直接在事件循环中渲染，适合小规模部署；
+    thread/process模式把渲染和编码交给线程池/进程池，
+    在途任务数超过 workers + queue_size 时新的渲染请求会等待空位（背压）
+    """
+
+    def __init__(
+        self,
+        mode: str = "sync",
+        workers: int = 2,
+        queue_size: int = 8,
+        encoder: ImageEncoder | None = None,
+        canvas_budget: int = DEFAULT_CANVAS_BUDGET,
+    ):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"未知的渲染模式: {mode}")
+        workers = max(1, workers)
+        self._mode = mode
+        self._workers = workers
+        self.encoder = encoder or ImageEncoder()
+        # 进程池中渲染不使用持久画布
+        self.canvases = CanvasCache(canvas_budget if mode != "process" else 0)
+        self._pool: Executor | None = None
+        if mode == "thread":
+            self._pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="wordle-render"
+            )
+        elif mode == "process":
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._capacity = workers + max(0, queue_size)
+        self._slots = asyncio.Semaphore(self._capacity)
+        self._in_flight = 0
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def shares_memory(self) -> bool:
+        """渲染是否与事件循环在同一进程中，可以复用canvases中的画布增量绘制"""
+        return self._mode != "process"
+
+    @property
+    def workers(self) -> int:
+        return self._workers if self._pool is not None else 1
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pool is None:
+            return fn(*args)
+
+        start = time.perf_counter()
+        async with self._slots:
+            METRICS.observe("render_wait", time.perf_counter() - start)
+            self._in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, fn, *args)
+            finally:
+                self._in_flight -= 1
+
+    async def render(self, fn: Callable[..., EncodedImage], *args: Any) -> bytes:
+        """执行渲染函数，编码参数作为最后一个参数传入，并记录编码体积与耗时"""
+        encoded = await self.run(fn, *args, self.encoder.options)
+        self.encoder.record(encoded)
+        METRICS.observe("draw", encoded.draw_time)
+        METRICS.observe("encode", encoded.encode_time)
+        return encoded.data
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+SYNC_RENDERER = RenderExecutor("sync")
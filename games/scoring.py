@@ -0,0 +1,244 @@
+import glob
+import hashlib
+import os
+import sys
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy为可选依赖，缺失时批量评分退回纯Python实现
+    np = None
+
+# 答案数量达到该值时批量评分才使用numpy，数量少时纯Python更快
+NUMPY_THRESHOLD = 64
+# 对局中预先编码的答案组达到该数量时使用整块评分
+BLOCK_THRESHOLD = 16
+
+
+def score(guess: str, answer: str) -> list[int]:
+    """计算单次猜测的反馈：2为位置正确，1为字母存在但位置错误，0为不存在
+
+    重复字母按答案中剩余的个数从左到右分配黄色
+    """
+    length = len(answer)
+    feedback = [0] * length
+    answer_char_counts: dict[str, int] = {}
+
+    for i in range(length):
+        if guess[i] == answer[i]:
+            feedback[i] = 2
+        else:
+            answer_char_counts[answer[i]] = answer_char_counts.get(answer[i], 0) + 1
+
+    for i in range(length):
+        if feedback[i] != 2:
+            char = guess[i]
+            if answer_char_counts.get(char, 0) > 0:
+                feedback[i] = 1
+                answer_char_counts[char] -= 1
+
+    return feedback
+
+
+def pattern_code(feedback: Sequence[int]) -> int:
+    """把反馈编码为三进制整数，第i位对应第i个字母"""
+    code = 0
+    for value in reversed(feedback):
+        code = code * 3 + value
+    return code
+
+
+def decode_pattern(code: int, length: int) -> list[int]:
+    feedback = []
+    for _ in range(length):
+        code, value = divmod(code, 3)
+        feedback.append(value)
+    return feedback
+
+
+def encode_words(words: Sequence[str]):
+    """把等长单词转换为 N×L 的uint8字母编码矩阵"""
+    if not words:
+        return np.zeros((0, 0), dtype=np.uint8)
+    length = len(words[0])
+    # 非ASCII字母替换为"?"，保证每个字符占一个字节
+    raw = np.frombuffer("".join(words).encode("ascii", "replace"), dtype=np.uint8)
+    return raw.reshape(len(words), length)
+
+
+def score_codes(guess: str, answer_codes):
+    """用numpy对一个猜测和 N×L 的答案编码矩阵评分，返回 N×L 的反馈矩阵"""
+    guess_codes = np.frombuffer(guess.encode("ascii", "replace"), dtype=np.uint8)
+    greens = answer_codes == guess_codes
+    feedback = greens.astype(np.uint8) * 2
+
+    remaining: dict[int, object] = {}
+    for i, code in enumerate(guess_codes):
+        if code not in remaining:
+            remaining[code] = ((answer_codes == code) & ~greens).sum(axis=1)
+        counts = remaining[code]
+        yellow = ~greens[:, i] & (counts > 0)
+        feedback[yellow, i] = 1
+        counts -= yellow
+    return feedback
+
+
+def score_many(guess: str, answers: Sequence[str]) -> list[list[int]]:
+    """用同一个猜测对多个答案评分"""
+    if np is None or len(answers) < NUMPY_THRESHOLD:
+        return [score(guess, answer) for answer in answers]
+    return score_codes(guess, encode_words(answers)).tolist()
+
+
+def score_block(guess: str, answer_codes):
+    """不按字母循环的整块评分，适合答案数量较少的 N×L 编码矩阵
+
+    第i个字母为黄色当且仅当：不是绿色，且答案中未匹配的该字母个数
+    大于猜测中它之前未匹配的同一字母个数
+    """
+    guess_codes = np.frombuffer(guess.encode("ascii", "replace"), dtype=np.uint8)
+    greens = answer_codes == guess_codes
+    unmatched = ~greens
+    available = (
+        (answer_codes[:, None, :] == guess_codes[None, :, None]) & unmatched[:, None, :]
+    ).sum(axis=2)
+    earlier = np.tril(guess_codes[:, None] == guess_codes[None, :], -1)
+    rank = unmatched.astype(np.intp) @ earlier.T.astype(np.intp)
+    yellows = unmatched & (rank < available)
+    return greens.astype(np.uint8) * 2 + yellows
+
+
+def score_guesses(guess_codes, answer: str):
+    """用一个答案对 N×L 的猜测编码矩阵整块评分，返回 N×L 的反馈矩阵
+
+    与score_block对称：第i个字母为黄色当且仅当不是绿色，且答案中未匹配的该字母个数
+    大于该猜测中它之前未匹配的同一字母个数
+    """
+    answer_codes = np.frombuffer(answer.encode("ascii", "replace"), dtype=np.uint8)
+    greens = guess_codes == answer_codes
+    unmatched = ~greens
+    available = (
+        (guess_codes[:, :, None] == answer_codes[None, None, :]) & unmatched[:, None, :]
+    ).sum(axis=2)
+    length = guess_codes.shape[1]
+    earlier = np.tri(length, k=-1, dtype=bool)
+    rank = (
+        (guess_codes[:, :, None] == guess_codes[:, None, :])
+        & earlier
+        & unmatched[:, None, :]
+    ).sum(axis=2)
+    yellows = unmatched & (rank < available)
+    return greens.astype(np.uint8) * 2 + yellows
+
+
+class AnswerBlock:
+    """一局中固定的一组答案，开局时编码一次，每次猜测一次性对全部答案评分"""
+
+    def __init__(self, answers: Sequence[str]):
+        self.answers = list(answers)
+        self._codes = None
+        if np is not None and len(self.answers) >= BLOCK_THRESHOLD:
+            self._codes = encode_words(self.answers)
+
+    def score(self, guess: str) -> list[list[int]]:
+        if self._codes is None:
+            return [score(guess, answer) for answer in self.answers]
+        return score_block(guess, self._codes).tolist()
+
+
+def pattern_row(guess: str, answer_codes):
+    """一个猜测对所有答案的三进制反馈编码"""
+    feedback = score_codes(guess, answer_codes).astype(np.uint32)
+    weights = 3 ** np.arange(feedback.shape[1], dtype=np.uint32)
+    return feedback @ weights
+
+
+def pattern_dtype(length: int):
+    max_code = 3**length
+    if max_code <= 2**8:
+        return np.uint8
+    if max_code <= 2**16:
+        return np.uint16
+    return np.uint32
+
+
+def words_digest(words: Sequence[str]) -> str:
+    return hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest()[:16]
+
+
+class PatternTable:
+    """猜测×答案的反馈编码矩阵，行列都按words的顺序排列
+
+    矩阵以.npy保存，文件名包含单词列表的摘要，单词或顺序变化后自动失效，
+    加载时使用mmap，多个进程共享同一份数据
+    """
+
+    def __init__(self, words: Sequence[str], patterns):
+        self.words = words
+        self.patterns = patterns
+        self._index = {word: i for i, word in enumerate(words)}
+
+    def index(self, word: str) -> int | None:
+        return self._index.get(word)
+
+    def row(self, guess: str):
+        return self.patterns[self._index[guess]]
+
+    @staticmethod
+    def cache_path(folder: str, name: str, words: Sequence[str]) -> str:
+        length = len(words[0]) if words else 0
+        return os.path.join(folder, f"{name}_{length}_{words_digest(words)}.npy")
+
+    @classmethod
+    def build(cls, words: Sequence[str]) -> "PatternTable":
+        if np is None:
+            raise RuntimeError("构建反馈矩阵需要安装numpy")
+        words = list(words)
+        length = len(words[0]) if words else 0
+        answer_codes = encode_words(words)
+        patterns = np.empty((len(words), len(words)), dtype=pattern_dtype(length))
+        for i, guess in enumerate(words):
+            patterns[i] = pattern_row(guess, answer_codes)
+        return cls(words, patterns)
+
+    @classmethod
+    def load(cls, folder: str, words: Sequence[str]) -> "PatternTable | None":
+        """按单词列表摘要查找缓存，不要求与构建时使用同一个词典名"""
+        if np is None or not words:
+            return None
+        pattern = os.path.join(
+            glob.escape(folder), f"*_{len(words[0])}_{words_digest(words)}.npy"
+        )
+        for path in glob.glob(pattern):
+            return cls(words, np.load(path, mmap_mode="r"))
+        return None
+
+    def save(self, folder: str, name: str) -> str:
+        os.makedirs(folder, exist_ok=True)
+        path = self.cache_path(folder, name, self.words)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, self.patterns)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load_or_build(
+        cls, folder: str, name: str, words: Sequence[str]
+    ) -> "PatternTable":
+        table = cls.load(folder, words)
+        if table is None:
+            table = cls.build(words)
+            table.save(folder, name)
+        return table
+
+
+if __name__ == "__main__":
+    # 用法: python games/scoring.py dict/classic.txt 5
+    source, length = sys.argv[1], int(sys.argv[2])
+    with open(source, "r", encoding="utf-8") as file:
+        bucket = {
+            word.upper(): None for word in file.read().split() if len(word) == length
+        }
+    name = os.path.splitext(os.path.basename(source))[0]
+    folder = os.path.join(os.path.dirname(source), "cache")
+    print(PatternTable.load_or_build(folder, name, sorted(bucket)).patterns.shape)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from .common import WordleBase  # type: ignore
+
+# 会话被移除时的回调：(session_id, game, reason)，reason为"expired"或"evicted"
+ExpireCallback = Callable[[str, WordleBase, str], Awaitable[None]]
+
+
+@dataclass
+class SessionEntry:
+    game: WordleBase
+    created_at: float = field(default_factory=time.time)
+    last_active: float = field(default_factory=time.time)
+
+
+class SessionStore:
+    """游戏会话存储
+
+    按最近活跃时间排序，超过max_sessions时淘汰最久未活跃的会话，
+    空闲超过ttl秒的会话由后台任务清理（读取时也会检查）
+    """
+
+    def __init__(
+        self,
+        ttl: float = 1800,
+        max_sessions: int = 1000,
+        on_expire: ExpireCallback | None = None,
+    ):
+        self._ttl = ttl
+        self._max_sessions = max(1, max_sessions)
+        self._on_expire = on_expire
+        self._entries: OrderedDict[str, SessionEntry] = OrderedDict()
+        self._sweeper: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+        self.expired_count = 0
+        self.evicted_count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_idle(self, entry: SessionEntry, now: float) -> bool:
+        return self._ttl > 0 and now - entry.last_active > self._ttl
+
+    def get(self, session_id: str) -> WordleBase | None:
+        """获取会话并刷新活跃时间"""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        now = time.time()
+        if self._is_idle(entry, now):
+            self._remove(session_id, "expired")
+            return None
+        entry.last_active = now
+        self._entries.move_to_end(session_id)
+        return entry.game
+
+    def put(self, session_id: str, game: WordleBase):
+        self._entries.pop(session_id, None)
+        self._entries[session_id] = SessionEntry(game)
+        while len(self._entries) > self._max_sessions:
+            oldest = next(iter(self._entries))
+            self._remove(oldest, "evicted")
+        self.start_sweeper()
+
+    def pop(self, session_id: str) -> WordleBase | None:
+        entry = self._entries.pop(session_id, None)
+        return entry.game if entry is not None else None
+
+    def _remove(self, session_id: str, reason: str):
+        entry = self._entries.pop(session_id)
+        if reason == "expired":
+            self.expired_count += 1
+        else:
+            self.evicted_count += 1
+        if self._on_expire is not None:
+            task = asyncio.create_task(self._on_expire(session_id, entry.game, reason))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def expire_idle(self) -> int:
+        """清理所有空闲超时的会话，返回清理数量"""
+        now = time.time()
+        idle = [
+            sid for sid, entry in self._entries.items() if self._is_idle(entry, now)
+        ]
+        for session_id in idle:
+            self._remove(session_id, "expired")
+        return len(idle)
+
+    async def _sweep_loop(self):
+        interval = min(60.0, self._ttl / 4)
+        while True:
+            await asyncio.sleep(interval)
+            self.expire_idle()
+
+    def start_sweeper(self):
+        if self._ttl <= 0:
+            return
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def memory_usage(self) -> int:
+        """所有会话自身占用内存的粗略估计（字节），不含共享的词表"""
+        return sum(entry.game.memory_usage() for entry in self._entries.values())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": len(self._entries),
+            "expired": self.expired_count,
+            "evicted": self.evicted_count,
+            "memory": self.memory_usage(),
+        }
+
+
+class SessionChoices:
+    """各会话的个人设置（如词典、棋盘样式），保存为JSON文件，未设置的会话使用全局默认值"""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._choices: dict[str, str] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._choices = json.load(f)
+        except (OSError, ValueError):
+            self._choices = {}
+
+    def get(self, session_id: str) -> str | None:
+        return self._choices.get(session_id)
+
+    def values(self) -> set[str]:
+        return set(self._choices.values())
+
+    def set(self, session_id: str, value: str | None):
+        """value为None时清除该会话的设置"""
+        with self._lock:
+            if value is None:
+                self._choices.pop(session_id, None)
+            else:
+                self._choices[session_id] = value
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            tmp_path = f"{self._path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._choices, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path)
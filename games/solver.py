@@ -0,0 +1,312 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass
+
+from .constraints import HardModeConstraints  # type: ignore
+from .scoring import (  # type: ignore
+    PatternTable,
+    encode_words,
+    np,
+    pattern_code,
+    pattern_row,
+    score,
+    words_digest,
+)
+
+OPENINGS_FILE = "openings.json"
+# 提示需要把分桶的全部单词读入内存，超过该数量的分桶（如流式加载的大词典）不提供提示
+MAX_HINT_WORDS = 100_000
+# 预热时只为不超过该单词数的分桶计算开局猜测，更大的分桶用命令行离线计算
+OPENING_WARMUP_MAX_WORDS = 2000
+
+# 一个棋盘的猜测历史：[(猜测, 反馈), ...]
+History = Sequence[tuple[str, Sequence[int]]]
+
+
+@dataclass
+class Hint:
+    guess: str
+    # 期望信息量（比特），多棋盘时为各棋盘之和
+    entropy: float
+    # 每个未猜中棋盘剩余的候选数
+    remaining: list[int]
+    evaluated: int
+    total: int
+
+    @property
+    def complete(self) -> bool:
+        return self.evaluated >= self.total
+
+
+class BucketIndex:
+    """一个(词典, 长度)分桶的提示索引，单词按字母序编号"""
+
+    def __init__(self, words: AbstractSet[str], cache_folder: str | None):
+        # 流式词典遍历时可能包含重复单词
+        self.words = sorted(set(words))
+        self.digest = words_digest(self.words)
+        self.codes = encode_words(self.words) if np is not None else None
+        self.table = (
+            PatternTable.load(cache_folder, self.words) if cache_folder else None
+        )
+        self.opening: tuple[str, float] | None = None
+        self._opening_lock = threading.Lock()
+
+    def patterns(self, guess: str, candidates):
+        """guess对每个候选的三进制反馈编码"""
+        if np is None:
+            return [pattern_code(score(guess, self.words[i])) for i in candidates]
+        if self.table is not None and self.table.index(guess) is not None:
+            return self.table.row(guess)[candidates]
+        return pattern_row(guess, self.codes[candidates])
+
+    def filter(self, history: History):
+        """返回与所有历史反馈一致的候选编号"""
+        if np is None:
+            return [
+                i
+                for i, word in enumerate(self.words)
+                if all(score(guess, word) == list(fb) for guess, fb in history)
+            ]
+        candidates = np.arange(len(self.words))
+        for guess, feedback in history:
+            code = pattern_code(feedback)
+            candidates = candidates[self.patterns(guess, candidates) == code]
+        return candidates
+
+    def entropy(self, guess: str, candidates) -> float:
+        if len(candidates) <= 1:
+            return 0.0
+        if np is None:
+            counts = list(Counter(self.patterns(guess, candidates)).values())
+            total = len(candidates)
+            return -sum(c / total * math.log2(c / total) for c in counts)
+        counts = np.bincount(self.patterns(guess, candidates))
+        probs = counts[counts > 0] / len(candidates)
+        return float(-(probs * np.log2(probs)).sum())
+
+    def allowed_guesses(self, constraints: list[HardModeConstraints]) -> set[int]:
+        """满足任一棋盘困难模式约束的猜测编号"""
+        if np is None:
+            return {
+                i
+                for i, word in enumerate(self.words)
+                if any(board.allows(word) for board in constraints)
+            }
+        allowed = np.zeros(len(self.words), dtype=bool)
+        for board in constraints:
+            allowed |= board.mask(self.codes)
+        return {int(i) for i in np.flatnonzero(allowed)}
+
+    def probe_order(self, boards: list) -> list[int]:
+        """候选词优先，其余按候选中字母出现频率排序，时限内先评估更可能的猜测"""
+        candidate_ids: set[int] = set()
+        for candidates in boards:
+            candidate_ids.update(int(i) for i in candidates)
+
+        letter_freq: Counter[str] = Counter()
+        for i in candidate_ids:
+            letter_freq.update(set(self.words[i]))
+
+        def heuristic(i: int) -> int:
+            return sum(letter_freq[c] for c in set(self.words[i]))
+
+        ordered = sorted(candidate_ids, key=heuristic, reverse=True)
+        others = sorted(
+            (i for i in range(len(self.words)) if i not in candidate_ids),
+            key=heuristic,
+            reverse=True,
+        )
+        return ordered + others
+
+    def best_guess(
+        self,
+        boards: list,
+        deadline: float | None,
+        allowed: set[int] | None = None,
+        stop: threading.Event | None = None,
+    ) -> Hint | None:
+        """在截止时间前评估尽可能多的猜测，返回目前为止最好的结果
+
+        allowed不为None时只评估其中的猜测（困难模式）；stop被设置时放弃计算并返回None
+        """
+        probes = self.probe_order(boards)
+        if allowed is not None:
+            probes = [i for i in probes if i in allowed] or probes
+        members = [{int(i) for i in candidates} for candidates in boards]
+        best_id, best_score, best_entropy = probes[0], -1.0, 0.0
+        evaluated = 0
+        for probe_id in probes:
+            if deadline is not None and evaluated and time.perf_counter() > deadline:
+                break
+            if stop is not None and stop.is_set():
+                return None
+            guess = self.words[probe_id]
+            entropy = sum(self.entropy(guess, candidates) for candidates in boards)
+            # 可能直接猜中某个棋盘的猜测额外加分
+            bonus = sum(
+                1 / len(candidates)
+                for candidates, ids in zip(boards, members)
+                if probe_id in ids
+            )
+            evaluated += 1
+            if entropy + bonus > best_score:
+                best_id, best_score, best_entropy = probe_id, entropy + bonus, entropy
+
+        return Hint(
+            self.words[best_id],
+            best_entropy,
+            [len(candidates) for candidates in boards],
+            evaluated,
+            len(probes),
+        )
+
+
+class HintEngine:
+    """基于信息熵的提示引擎
+
+    开局最优猜测与历史无关，按分桶预先计算并缓存到磁盘；
+    对局中先按历史反馈筛选候选，再在时限内按期望信息量挑选猜测
+    """
+
+    def __init__(
+        self,
+        cache_folder: str | None = None,
+        budget: float = 0.3,
+        max_indexes: int = 8,
+    ):
+        self._cache_folder = cache_folder
+        self._budget = budget
+        self._max_indexes = max_indexes
+        # 以单词集合对象的id为键，同时持有集合本身保证id不被复用
+        self._indexes: OrderedDict[int, tuple[AbstractSet[str], BucketIndex]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def index(self, words: AbstractSet[str]) -> BucketIndex:
+        with self._lock:
+            cached = self._indexes.get(id(words))
+            if cached is not None and cached[0] is words:
+                self._indexes.move_to_end(id(words))
+                return cached[1]
+
+            index = BucketIndex(words, self._cache_folder)
+            index.opening = self._load_opening(index.digest)
+            self._indexes[id(words)] = (words, index)
+            while len(self._indexes) > self._max_indexes:
+                self._indexes.popitem(last=False)
+            return index
+
+    def suggest(
+        self,
+        words: AbstractSet[str],
+        histories: list[History],
+        constraints: list[HardModeConstraints] | None = None,
+    ) -> Hint | None:
+        """histories为每个未猜中棋盘的猜测历史，constraints为困难模式下各棋盘的约束"""
+        if not histories or not words or len(words) > MAX_HINT_WORDS:
+            return None
+        index = self.index(words)
+
+        if all(not history for history in histories):
+            return self._opening_hint(index, len(histories))
+
+        boards = [index.filter(history) for history in histories]
+        boards = [candidates for candidates in boards if len(candidates)]
+        if not boards:
+            return None
+        allowed = index.allowed_guesses(constraints) if constraints else None
+        return index.best_guess(boards, time.perf_counter() + self._budget, allowed)
+
+    def precompute_opening(self, words: AbstractSet[str]) -> tuple[str, float] | None:
+        """同步计算并缓存开局最优猜测，close()后放弃计算并返回None
+
+        计算量约为分桶大小的平方，由预热（只处理小分桶）或命令行离线调用，不在提示请求中触发
+        """
+        index = self.index(words)
+        with index._opening_lock:
+            if index.opening is None:
+                hint = index.best_guess(
+                    [list(range(len(index.words)))], None, stop=self._stop
+                )
+                if hint is None:
+                    return None
+                index.opening = (hint.guess, hint.entropy)
+                self._save_opening(index.digest, index.opening)
+            return index.opening
+
+    def close(self):
+        """停止正在进行的开局计算"""
+        self._stop.set()
+
+    def _opening_hint(self, index: BucketIndex, board_count: int) -> Hint:
+        total = len(index.words)
+        if index.opening is not None:
+            guess, entropy = index.opening
+            return Hint(
+                guess, entropy * board_count, [total] * board_count, total, total
+            )
+
+        # 没有预先计算的开局猜测时只返回时限内的结果
+        all_ids = list(range(total))
+        hint = index.best_guess([all_ids], time.perf_counter() + self._budget)
+        hint.entropy *= board_count
+        hint.remaining = [total] * board_count
+        return hint
+
+    def _openings_path(self) -> str | None:
+        if self._cache_folder is None:
+            return None
+        return os.path.join(self._cache_folder, OPENINGS_FILE)
+
+    def _read_openings(self) -> dict:
+        path = self._openings_path()
+        if path is None or not os.path.isfile(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load_opening(self, digest: str) -> tuple[str, float] | None:
+        opening = self._read_openings().get(digest)
+        if opening is None:
+            return None
+        return opening["guess"], opening["entropy"]
+
+    def _save_opening(self, digest: str, opening: tuple[str, float]):
+        path = self._openings_path()
+        if path is None:
+            return
+        with self._lock:
+            openings = self._read_openings()
+            openings[digest] = {"guess": opening[0], "entropy": opening[1]}
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(openings, f)
+            os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    # 用法: python games/solver.py dict/all.txt 5 6 7
+    source, lengths = sys.argv[1], [int(arg) for arg in sys.argv[2:]]
+    with open(source, "r", encoding="utf-8") as file:
+        words = {word.upper() for word in file.read().split()}
+    engine = HintEngine(os.path.join(os.path.dirname(source), "cache"))
+    for length in lengths:
+        bucket = frozenset(word for word in words if len(word) == length)
+        start = time.perf_counter()
+        opening = engine.precompute_opening(bucket)
+        elapsed = time.perf_counter() - start
+        print(f"{length}: {opening}，{len(bucket)}个单词，耗时{elapsed:.1f}s")
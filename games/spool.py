@@ -0,0 +1,97 @@
+import asyncio
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
+from .metrics import METRICS  # type: ignore
+
+SPOOL_DIR_NAME = "astrbot_plugin_wordle"
+
+
+def default_spool_folder() -> str:
+    # 优先使用内存文件系统
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return os.path.join("/dev/shm", SPOOL_DIR_NAME)
+    return os.path.join(tempfile.gettempdir(), SPOOL_DIR_NAME)
+
+
+def _write_file(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _remove_file(path: str):
+    with suppress(FileNotFoundError):
+        os.remove(path)
+
+
+class ImageSpool:
+    """平台不支持直接发送图片数据时使用的临时文件目录
+
+    写入和删除都在线程中进行，发送结束后立即删除，
+    异常退出遗留的文件由后台清理任务按max_age删除
+    """
+
+    def __init__(self, folder: str | None = None, max_age: float = 600):
+        self._folder = folder or default_spool_folder()
+        self._max_age = max_age
+        self._sweeper: asyncio.Task | None = None
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    def _new_path(self, name: str, suffix: str) -> str:
+        # 保证兼容性,处理Windows下非法路径问题
+        name = re.sub(r'[\\/:*?"<>|!]', "_", name)
+        return os.path.join(self._folder, f"{name}_{uuid.uuid4().hex}{suffix}")
+
+    @asynccontextmanager
+    async def spooled(
+        self, name: str, data: bytes, suffix: str = ".png"
+    ) -> AsyncIterator[str]:
+        """写入临时文件并返回路径，退出时无论是否异常都会删除"""
+        self.start_sweeper()
+        await asyncio.to_thread(os.makedirs, self._folder, exist_ok=True)
+        path = self._new_path(name, suffix)
+        try:
+            with METRICS.timer("file_io"):
+                await asyncio.to_thread(_write_file, path, data)
+            yield path
+        finally:
+            await asyncio.to_thread(_remove_file, path)
+
+    def sweep(self) -> int:
+        """删除超过max_age的遗留文件，返回删除数量"""
+        removed = 0
+        deadline = time.time() - self._max_age
+        try:
+            entries = list(os.scandir(self._folder))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.to_thread(self.sweep)
+            await asyncio.sleep(self._max_age / 2)
+
+    def start_sweeper(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
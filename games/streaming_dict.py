@@ -0,0 +1,331 @@
+import hashlib
+import os
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterator
+from collections.abc import Set as AbstractSet
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # numpy为可选依赖，缺失时逐个单词构建布隆过滤器
+    np = None
+
+INDEX_SUFFIX = ".wbf"
+CHUNK_SIZE = 1 << 20
+# 每个单词约10位时误判率约1%
+BITS_PER_WORD = 10
+HASH_COUNT = 7
+MASK64 = (1 << 64) - 1
+
+# 索引文件布局：
+#   头部     magic(4s) version(H) length_count(H) source_mtime_ns(q) source_size(q)
+#            chunk_count(I)
+#   分块     chunk_count+1个起始偏移(q)，最后一个为文件末尾
+#   每个长度 length(H) hash_count(H) count(Q) bloom_bytes(Q)，
+#            随后是每个分块中该长度的单词数(I)和布隆过滤器位图
+MAGIC = b"WDBF"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqqI")
+LENGTH_ENTRY = struct.Struct("<HHQQ")
+
+
+def iter_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[int, bytes]]:
+    """按块读取文件，每块在换行处截断，返回(块起始偏移, 块内容)"""
+    with open(path, "rb") as file:
+        offset = 0
+        tail = b""
+        while True:
+            data = file.read(chunk_size)
+            if not data:
+                if tail:
+                    yield offset, tail
+                return
+            data = tail + data
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                tail = data
+                continue
+            yield offset, data[:cut]
+            offset += cut
+            tail = data[cut:]
+
+
+def chunk_words(chunk: bytes) -> Iterator[str]:
+    """块中的单词，忽略词频等非字母字段"""
+    for token in chunk.decode("utf-8", "replace").split():
+        if token.isalpha():
+            yield token.upper()
+
+
+def _digest(word: str) -> bytes:
+    return hashlib.blake2b(word.encode("utf-8"), digest_size=16).digest()
+
+
+def _hashes(word: str, size: int, hash_count: int) -> Iterator[int]:
+    """双重哈希，按64位无符号整数回绕，与numpy批量计算的结果一致"""
+    digest = _digest(word)
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    for i in range(hash_count):
+        yield ((h1 + i * h2) & MASK64) % size
+
+
+class BloomFilter:
+    def __init__(self, bits: bytearray | bytes, hash_count: int = HASH_COUNT):
+        self.bits = bits
+        self.hash_count = hash_count
+        self._size = len(bits) * 8
+
+    @classmethod
+    def for_count(cls, count: int) -> "BloomFilter":
+        return cls(bytearray(max(8, (count * BITS_PER_WORD + 7) // 8)))
+
+    def add(self, word: str):
+        for position in _hashes(word, self._size, self.hash_count):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def add_many(self, words: list[str]):
+        if np is None or not words:
+            for word in words:
+                self.add(word)
+            return
+        digests = np.frombuffer(
+            b"".join(_digest(word) for word in words), dtype="<u8"
+        ).reshape(-1, 2)
+        h1, h2 = digests[:, 0:1], digests[:, 1:2] | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        positions = ((h1 + steps * h2) % np.uint64(self._size)).ravel()
+        bits = np.frombuffer(self.bits, dtype=np.uint8)
+        np.bitwise_or.at(
+            bits,
+            (positions >> np.uint64(3)).astype(np.intp),
+            np.left_shift(1, positions & np.uint64(7)).astype(np.uint8),
+        )
+
+    def __contains__(self, word: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in _hashes(word, self._size, self.hash_count)
+        )
+
+
+class StreamingBucket(AbstractSet):
+    """大词典的一个长度分桶，用布隆过滤器判断成员（约1%误判），遍历时从文件流式读取"""
+
+    def __init__(self, dictionary: "StreamingDictionary", length: int):
+        self._dictionary = dictionary
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._dictionary.count(self._length)
+
+    def __iter__(self) -> Iterator[str]:
+        # 源文件中的重复单词会重复出现
+        for _, chunk in iter_chunks(self._dictionary.path):
+            for word in chunk_words(chunk):
+                if len(word) == self._length:
+                    yield word
+
+    def sample(self, count: int) -> list[str]:
+        return self._dictionary.sample(self._length, count)
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str) or len(word) != self._length:
+            return False
+        bloom = self._dictionary.bloom(self._length)
+        return bloom is not None and word in bloom
+
+    __hash__ = object.__hash__
+
+
+class StreamingDictionary:
+    """不把单词读入内存的大词典
+
+    加载时流式扫描两遍源文件：第一遍统计每块中各长度的单词数，
+    第二遍填充各长度的布隆过滤器，结果保存为索引文件供下次启动直接读取。
+    抽取答案时按名次随机选词，只读取选中单词所在的块
+    """
+
+    def __init__(self, name: str, path: str, index_path: str):
+        self.name = name
+        self.path = path
+        stat = os.stat(path)
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self._offsets: list[int] = []
+        # length -> 各块该长度单词数的前缀和
+        self._cumulative: dict[int, list[int]] = {}
+        self._blooms: dict[int, BloomFilter] = {}
+        self._buckets: dict[int, StreamingBucket] = {}
+
+        if not self._load_index(index_path):
+            self._build()
+            self._save_index(index_path)
+
+    def _build(self):
+        counts: dict[int, array] = {}
+        self._offsets = []
+        for chunk_idx, (offset, chunk) in enumerate(iter_chunks(self.path)):
+            self._offsets.append(offset)
+            for word in chunk_words(chunk):
+                length = len(word)
+                chunk_counts = counts.get(length)
+                if chunk_counts is None:
+                    chunk_counts = counts[length] = array("I")
+                if len(chunk_counts) <= chunk_idx:
+                    chunk_counts.extend([0] * (chunk_idx + 1 - len(chunk_counts)))
+                chunk_counts[chunk_idx] += 1
+        self._offsets.append(self.size)
+
+        chunk_count = len(self._offsets) - 1
+        for length, chunk_counts in counts.items():
+            chunk_counts.extend([0] * (chunk_count - len(chunk_counts)))
+            self._cumulative[length] = list(accumulate(chunk_counts))
+            self._blooms[length] = BloomFilter.for_count(self.count(length))
+
+        for _, chunk in iter_chunks(self.path):
+            grouped: dict[int, list[str]] = {}
+            for word in chunk_words(chunk):
+                grouped.setdefault(len(word), []).append(word)
+            for length, words in grouped.items():
+                self._blooms[length].add_many(words)
+
+    def _load_index(self, index_path: str) -> bool:
+        try:
+            with open(index_path, "rb") as file:
+                data = file.read()
+            magic, version, length_count, mtime_ns, size, chunk_count = (
+                HEADER.unpack_from(data, 0)
+            )
+        except (OSError, struct.error):
+            return False
+        if (magic, version, mtime_ns, size) != (
+            MAGIC,
+            VERSION,
+            self.mtime_ns,
+            self.size,
+        ):
+            return False
+
+        pos = HEADER.size
+        offsets = array("q")
+        offsets.frombytes(data[pos : pos + (chunk_count + 1) * 8])
+        self._offsets = offsets.tolist()
+        pos += (chunk_count + 1) * 8
+        for _ in range(length_count):
+            length, hash_count, _, bloom_bytes = LENGTH_ENTRY.unpack_from(data, pos)
+            pos += LENGTH_ENTRY.size
+            chunk_counts = array("I")
+            chunk_counts.frombytes(data[pos : pos + chunk_count * 4])
+            pos += chunk_count * 4
+            self._cumulative[length] = list(accumulate(chunk_counts))
+            self._blooms[length] = BloomFilter(
+                data[pos : pos + bloom_bytes], hash_count
+            )
+            pos += bloom_bytes
+        return True
+
+    def _save_index(self, index_path: str):
+        chunk_count = len(self._offsets) - 1
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    len(self._blooms),
+                    self.mtime_ns,
+                    self.size,
+                    chunk_count,
+                )
+            )
+            file.write(array("q", self._offsets).tobytes())
+            for length, bloom in self._blooms.items():
+                cumulative = self._cumulative[length]
+                chunk_counts = array(
+                    "I", (b - a for a, b in zip([0, *cumulative], cumulative))
+                )
+                file.write(
+                    LENGTH_ENTRY.pack(
+                        length, bloom.hash_count, self.count(length), len(bloom.bits)
+                    )
+                )
+                file.write(chunk_counts.tobytes())
+                file.write(bloom.bits)
+        os.replace(tmp_path, index_path)
+
+    def count(self, length: int) -> int:
+        cumulative = self._cumulative.get(length)
+        return cumulative[-1] if cumulative else 0
+
+    def bloom(self, length: int) -> BloomFilter | None:
+        return self._blooms.get(length)
+
+    def bucket(self, length: int) -> StreamingBucket:
+        bucket = self._buckets.get(length)
+        if bucket is None:
+            bucket = self._buckets[length] = StreamingBucket(self, length)
+        return bucket
+
+    def lookup(self, length: int) -> StreamingBucket:
+        return self.bucket(length)
+
+    def _words_at(self, length: int, ranks: list[int]) -> list[str]:
+        """按名次取出该长度的单词，同一块中的名次只读一次"""
+        cumulative = self._cumulative[length]
+        by_chunk: dict[int, list[int]] = {}
+        for rank in ranks:
+            chunk_idx = bisect_right(cumulative, rank)
+            start = cumulative[chunk_idx - 1] if chunk_idx else 0
+            by_chunk.setdefault(chunk_idx, []).append(rank - start)
+
+        found: dict[tuple[int, int], str] = {}
+        with open(self.path, "rb") as file:
+            for chunk_idx, positions in by_chunk.items():
+                file.seek(self._offsets[chunk_idx])
+                chunk = file.read(
+                    self._offsets[chunk_idx + 1] - self._offsets[chunk_idx]
+                )
+                wanted = set(positions)
+                words = (word for word in chunk_words(chunk) if len(word) == length)
+                for position, word in enumerate(words):
+                    if position in wanted:
+                        found[(chunk_idx, position)] = word
+                        wanted.discard(position)
+                        if not wanted:
+                            break
+
+        result = []
+        for rank in ranks:
+            chunk_idx = bisect_right(cumulative, rank)
+            start = cumulative[chunk_idx - 1] if chunk_idx else 0
+            result.append(found[(chunk_idx, rank - start)])
+        return result
+
+    def sample(self, length: int, count: int) -> list[str]:
+        total = self.count(length)
+        ranks = random.sample(range(total), count)
+        words = self._words_at(length, ranks)
+        # 源文件可能有重复单词，重抽直到没有重复或候选不足
+        for _ in range(8):
+            unique = list(dict.fromkeys(words))
+            if len(unique) == count or total <= count:
+                return unique
+            extra = random.sample(range(total), count - len(unique))
+            words = unique + self._words_at(length, extra)
+        return list(dict.fromkeys(words))
+
+
+if __name__ == "__main__":
+    # 用法: python games/streaming_dict.py dict/huge.txt
+    source = sys.argv[1]
+    name = os.path.splitext(os.path.basename(source))[0]
+    index = os.path.join(os.path.dirname(source), "cache", f"{name}{INDEX_SUFFIX}")
+    dictionary = StreamingDictionary(name, source, index)
+    for word_length in sorted(dictionary._cumulative):
+        print(word_length, dictionary.count(word_length))
@@ -0,0 +1,80 @@
+import time
+
+BOARD_MODES = ("image", "text", "auto")
+
+FEEDBACK_EMOJI = {
+    2: "🟩",
+    1: "🟨",
+    0: "⬜",
+    -1: "⬛",
+}
+KEYBOARD_ROWS = ["QWERTYUIOP", "ASDFGHJKL", "ZXCVBNM"]
+# 图片耗时的指数移动平均系数
+LATENCY_ALPHA = 0.3
+
+
+def feedback_emoji(feedback: list[int]) -> str:
+    return "".join(FEEDBACK_EMOJI[value] for value in feedback)
+
+
+def feedback_row(word: str, feedback: list[int]) -> str:
+    return f"{feedback_emoji(feedback)} {word}"
+
+
+def keyboard_line(letter_status: dict[str, int]) -> str:
+    """紧凑的键盘行：已知存在的字母大写，未猜过的小写，已排除的显示为点"""
+    rows = []
+    for keyboard_row in KEYBOARD_ROWS:
+        keys = []
+        for letter in keyboard_row:
+            status = letter_status.get(letter, -1)
+            if status > 0:
+                keys.append(letter)
+            elif status == 0:
+                keys.append("·")
+            else:
+                keys.append(letter.lower())
+        rows.append("".join(keys))
+    return " ".join(rows)
+
+
+class ImageLatency:
+    """auto模式下按平台记录图片棋盘的耗时（渲染+发送）
+
+    移动平均超过threshold秒后该平台改发文字棋盘，
+    retry_after秒后再尝试发送一次图片重新测量
+    """
+
+    def __init__(self, threshold: float = 3.0, retry_after: float = 300):
+        self._threshold = threshold
+        self._retry_after = retry_after
+        self._latency: dict[str, float] = {}
+        self._slow_since: dict[str, float] = {}
+
+    def observe(self, platform: str, seconds: float):
+        previous = self._latency.get(platform)
+        if previous is None:
+            latency = seconds
+        else:
+            latency = previous + LATENCY_ALPHA * (seconds - previous)
+        self._latency[platform] = latency
+        if latency > self._threshold:
+            self._slow_since[platform] = time.monotonic()
+
+    def prefers_text(self, platform: str) -> bool:
+        slow_since = self._slow_since.get(platform)
+        if slow_since is None:
+            return False
+        if time.monotonic() - slow_since >= self._retry_after:
+            # 冷却结束，下一次发送图片并以其耗时重新计算
+            del self._slow_since[platform]
+            self._latency.pop(platform, None)
+            return False
+        return True
+
+    def latency(self, platform: str) -> float | None:
+        return self._latency.get(platform)
+
+    @property
+    def degraded(self) -> list[str]:
+        return list(self._slow_since)
@@ -0,0 +1,80 @@
+import time
+from collections.abc import Iterable
+
+from . import wordle_classic, wordle_multi, worlde_octordle  # type: ignore
+from .encode import EncoderOptions, encode_image  # type: ignore
+
+WARMUP_STAGES = {
+    "dictionaries": "词典",
+    "fonts": "字体",
+    "templates": "棋盘模板",
+    "daily": "每日挑战",
+    "openings": "开局提示",
+}
+
+
+def warm_fonts():
+    """字体和字母格子按进程缓存，预先加载避免首局绘制时解析字体"""
+    octordle = worlde_octordle.octordle_layout()
+    wordle_classic.get_font()
+    wordle_multi.get_font(octordle.font_size)
+    for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        for feedback in (0, 1, 2):
+            wordle_classic.letter_tile(letter, feedback)
+            wordle_multi.letter_tile(letter, feedback, octordle.cell)
+
+
+def warm_templates(lengths: Iterable[int], options: EncoderOptions):
+    """预绘制各长度的空棋盘，并编码一次以完成Pillow编码器和调色板的初始化"""
+    for length in lengths:
+        wordle_classic.empty_board(length, length + 1)
+    encode_image(
+        wordle_classic.empty_board(5, 6), options, wordle_classic.PALETTE_COLORS
+    )
+    octordle = worlde_octordle.octordle_layout()
+    encode_image(
+        wordle_multi.empty_board(octordle), options, wordle_multi.PALETTE_COLORS
+    )
+
+
+def warm_renderer(lengths: tuple[int, ...], options: EncoderOptions) -> float:
+    """在渲染进程中执行的预热，返回耗时"""
+    start = time.perf_counter()
+    warm_fonts()
+    warm_templates(lengths, options)
+    return time.perf_counter() - start
+
+
+class WarmupStatus:
+    """各预热阶段是否完成，命令只查询状态，不等待预热"""
+
+    def __init__(self):
+        self.ready: dict[str, bool] = dict.fromkeys(WARMUP_STAGES, False)
+        self.errors: dict[str, str] = {}
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return all(self.ready.values())
+
+    def mark(self, stage: str):
+        self.ready[stage] = True
+
+    def fail(self, stage: str, error: Exception):
+        self.errors[stage] = str(error)
+
+    def summary(self) -> str:
+        parts = []
+        for stage, name in WARMUP_STAGES.items():
+            if self.ready[stage]:
+                state = "完成"
+            elif stage in self.errors:
+                state = "失败"
+            else:
+                state = "进行中"
+            parts.append(f"{name}{state}")
+        line = "预热: " + "，".join(parts)
+        if self.started_at is not None and self.finished_at is not None:
+            line += f"（耗时{self.finished_at - self.started_at:.1f}s）"
+        return line
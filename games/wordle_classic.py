@@ -1,108 +1,256 @@
-from io import BytesIO
+import threading
+import time
+import weakref
+from collections.abc import Set as AbstractSet
+from functools import lru_cache
+from typing import Any
 
 from PIL import Image as ImageW
 from PIL import ImageDraw, ImageFont
-from .common import WordleBase  # type: ignore
+
+from .common import WordleBase, estimate_size  # type: ignore
+from .constraints import HardModeConstraints  # type: ignore
+from .encode import EncodedImage, EncoderOptions, encode_image  # type: ignore
+from .metrics import METRICS  # type: ignore
+from .render import SYNC_RENDERER, RenderExecutor  # type: ignore
+from .scoring import score  # type: ignore
+from .text_board import feedback_row  # type: ignore
+
+CELL_COLORS = {
+    2: (106, 170, 100),
+    1: (201, 180, 88),
+    0: (120, 124, 126),
+    -1: (211, 214, 218),
+}
+BACKGROUND_COLOR = (255, 255, 255)
+TEXT_COLOR = (255, 255, 255)
+
+CELL_SIZE = 60
+CELL_MARGIN = 5
+GRID_MARGIN = 5
+PALETTE_COLORS = (*CELL_COLORS.values(), BACKGROUND_COLOR)
+
+
+@lru_cache(maxsize=1)
+def get_font() -> ImageFont.ImageFont | ImageFont.FreeTypeFont:
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=256)
+def letter_tile(letter: str, feedback_value: int) -> ImageW.Image:
+    """预渲染的单个格子，进程内按(字母, 反馈)缓存，只读共享"""
+    # 与格子矩形[x, x + CELL_SIZE]一致，包含右下边界
+    tile = ImageW.new(
+        "RGB", (CELL_SIZE + 1, CELL_SIZE + 1), CELL_COLORS[feedback_value]
+    )
+    if letter:
+        draw = ImageDraw.Draw(tile)
+        font = get_font()
+        text_bbox = draw.textbbox((0, 0), letter, font=font)
+        text_width = text_bbox[2] - text_bbox[0]
+        text_height = text_bbox[3] - text_bbox[1]
+
+        letter_x = (CELL_SIZE - text_width) // 2
+        letter_y = (CELL_SIZE - text_height) // 2
+
+        draw.text((letter_x, letter_y), letter, fill=TEXT_COLOR, font=font)
+    return tile
+
+
+@lru_cache(maxsize=32)
+def empty_board(length: int, max_attempts: int) -> ImageW.Image:
+    """预绘制的空棋盘模板，使用时需要copy"""
+    cell_stride = CELL_SIZE + CELL_MARGIN
+    width = GRID_MARGIN * 2 + cell_stride * length - CELL_MARGIN
+    height = GRID_MARGIN * 2 + cell_stride * max_attempts - CELL_MARGIN
+
+    image = ImageW.new("RGB", (width, height), BACKGROUND_COLOR)
+    empty = letter_tile("", -1)
+    for row in range(max_attempts):
+        for col in range(length):
+            image.paste(empty, cell_origin(row, col))
+    return image
+
+
+def cell_origin(row: int, col: int) -> tuple[int, int]:
+    cell_stride = CELL_SIZE + CELL_MARGIN
+    return GRID_MARGIN + col * cell_stride, GRID_MARGIN + row * cell_stride
+
+
+def paint_rows(
+    image: ImageW.Image,
+    start: int,
+    guesses: list[str],
+    feedbacks: list[list[int]],
+):
+    for row in range(start, len(guesses)):
+        for col, letter in enumerate(guesses[row]):
+            image.paste(
+                letter_tile(letter.upper(), feedbacks[row][col]), cell_origin(row, col)
+            )
+
+
+def render_board(
+    length: int,
+    max_attempts: int,
+    guesses: list[str],
+    feedbacks: list[list[int]],
+    options: EncoderOptions,
+) -> EncodedImage:
+    """从空棋盘模板完整绘制并编码，只依赖可序列化的参数以便在进程池中执行"""
+    start = time.perf_counter()
+    image = empty_board(length, max_attempts).copy()
+    paint_rows(image, 0, guesses, feedbacks)
+    return encode_image(image, options, PALETTE_COLORS, time.perf_counter() - start)
 
 
 class WordleClassic(WordleBase):
-    def __init__(self, answer: str, valid_words: list[str]):
+    kind = "classic"
+
+    def __init__(
+        self,
+        answer: str,
+        valid_words: AbstractSet[str],
+        renderer: RenderExecutor = SYNC_RENDERER,
+        dict_name: str = "classic",
+        hard_mode: bool = False,
+    ):
         self._answer = answer.upper()
         self._valid_words = valid_words
+        self._dict_name = dict_name
         self._length = len(answer)
         self._max_attempts = self._length + 1
         self._guesses: list[str] = []
         self._feedbacks: list[list[int]] = []
-        self._font = ImageFont.load_default()
-
-    async def gen_image(self) -> bytes:
-        CELL_COLORS = {
-            2: (106, 170, 100),
-            1: (201, 180, 88),
-            0: (120, 124, 126),
-            -1: (211, 214, 218),
-        }
-        BACKGROUND_COLOR = (255, 255, 255)
-        TEXT_COLOR = (255, 255, 255)
+        self._constraints = HardModeConstraints(self._length) if hard_mode else None
+        self._players: dict[str, str] = {}
+        self._renderer = renderer
+        # 画布保存在渲染器共享的CanvasCache中，对局结束被回收时一并释放
+        self._canvas_key = renderer.canvases.new_key()
+        weakref.finalize(self, renderer.canvases.discard, self._canvas_key)
+        self._painted_rows = 0
+        self._canvas_lock = threading.Lock()
 
-        CELL_SIZE = 60
-        CELL_MARGIN = 5
-        GRID_MARGIN = 5
+    def _render_incremental(
+        self,
+        guesses: list[str],
+        feedbacks: list[list[int]],
+        options: EncoderOptions,
+    ) -> EncodedImage:
+        """在缓存的画布上只补画新增的行，画布已被淘汰时从模板重新绘制"""
+        canvases = self._renderer.canvases
+        with self._canvas_lock:
+            start = time.perf_counter()
+            canvas = canvases.get(self._canvas_key)
+            if canvas is None:
+                canvas = empty_board(self._length, self._max_attempts).copy()
+                self._painted_rows = 0
+            paint_rows(canvas, self._painted_rows, guesses, feedbacks)
+            self._painted_rows = max(self._painted_rows, len(guesses))
+            canvases.put(self._canvas_key, canvas)
+            return encode_image(
+                canvas, options, PALETTE_COLORS, time.perf_counter() - start
+            )
 
-        cell_stride = CELL_SIZE + CELL_MARGIN
-        width = GRID_MARGIN * 2 + cell_stride * self._length - CELL_MARGIN
-        height = GRID_MARGIN * 2 + cell_stride * self._max_attempts - CELL_MARGIN
-
-        image = ImageW.new("RGB", (width, height), BACKGROUND_COLOR)
-        draw = ImageDraw.Draw(image)
-
-        for row in range(self._max_attempts):
-            y = GRID_MARGIN + row * cell_stride
+    async def gen_image(self) -> bytes:
+        guesses = list(self._guesses)
+        feedbacks = [list(feedback) for feedback in self._feedbacks]
+        if self._renderer.shares_memory:
+            return await self._renderer.render(
+                self._render_incremental, guesses, feedbacks
+            )
+        # 进程池无法持有画布，退回到基于模板的完整绘制
+        return await self._renderer.render(
+            render_board, self._length, self._max_attempts, guesses, feedbacks
+        )
 
-            for col in range(self._length):
-                x = GRID_MARGIN + col * cell_stride
+    def gen_text(self) -> str:
+        return "\n".join(
+            feedback_row(word, feedback)
+            for word, feedback in zip(self._guesses, self._feedbacks)
+        )
 
-                if row < len(self._guesses) and col < len(self._guesses[row]):
-                    letter = self._guesses[row][col].upper()
-                    feedback_value = self._feedbacks[row][col]
-                    cell_color = CELL_COLORS[feedback_value]
-                else:
-                    letter = ""
-                    cell_color = CELL_COLORS[-1]
+    def apply_guess(self, word: str):
+        word = word.upper()
+        self._guesses.append(word)
 
-                draw.rectangle(
-                    [x, y, x + CELL_SIZE, y + CELL_SIZE], fill=cell_color, outline=None
-                )
+        with METRICS.timer("score"):
+            feedback = self._score(word)
+        self._apply_feedback(word, feedback)
 
-                if letter:
-                    text_bbox = draw.textbbox((0, 0), letter, font=self._font)
-                    text_width = text_bbox[2] - text_bbox[0]
-                    text_height = text_bbox[3] - text_bbox[1]
+    def _score(self, word: str) -> list[int]:
+        return score(word, self._answer)
 
-                    letter_x = x + (CELL_SIZE - text_width) // 2
-                    letter_y = y + (CELL_SIZE - text_height) // 2
+    def _apply_feedback(self, word: str, feedback: list[int]):
+        self._feedbacks.append(feedback)
+        if self._constraints is not None:
+            self._constraints.add(word, feedback)
 
-                    draw.text(
-                        (letter_x, letter_y), letter, fill=TEXT_COLOR, font=self._font
-                    )
+    def hard_mode_violation(self, word: str) -> str | None:
+        if self._constraints is None:
+            return None
+        return self._constraints.violation(word)
 
-        with BytesIO() as output:
-            image.save(output, format="PNG")
-            return output.getvalue()
+    def hard_mode_constraints(self) -> list[HardModeConstraints]:
+        if self._constraints is None or self.is_won:
+            return []
+        return [self._constraints]
 
     async def guess(self, word: str) -> bytes:
-        word = word.upper()
-        self._guesses.append(word)
+        self.apply_guess(word)
+        return await self.gen_image()
 
-        feedback = [0] * self._length
-        answer_char_counts: dict[str, int] = {}
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "answer": self._answer,
+            "dict": self._dict_name,
+            "hard": self.hard_mode,
+            "players": dict(self._players),
+            "guesses": list(self._guesses),
+            "feedbacks": [list(feedback) for feedback in self._feedbacks],
+        }
 
-        for i in range(self._length):
-            if word[i] == self._answer[i]:
-                feedback[i] = 2
-            else:
-                answer_char_counts[self._answer[i]] = (
-                    answer_char_counts.get(self._answer[i], 0) + 1
-                )
+    @classmethod
+    def from_state(
+        cls,
+        state: dict[str, Any],
+        valid_words: AbstractSet[str],
+        renderer: RenderExecutor = SYNC_RENDERER,
+    ) -> "WordleClassic":
+        game = cls(
+            state["answer"],
+            valid_words,
+            renderer,
+            state["dict"],
+            state.get("hard", False),
+        )
+        game._replay(state)
+        return game
 
-        for i in range(self._length):
-            if feedback[i] != 2:
-                char = word[i]
-                if char in answer_char_counts and answer_char_counts[char] > 0:
-                    feedback[i] = 1
-                    answer_char_counts[char] -= 1
+    def _replay(self, state: dict[str, Any]):
+        for word, feedback in zip(state["guesses"], state["feedbacks"]):
+            self._guesses.append(word)
+            self._apply_feedback(word, list(feedback))
+        self._players = dict(state.get("players", {}))
 
-        self._feedbacks.append(feedback)
-        result = await self.gen_image()
+    def memory_usage(self) -> int:
+        return estimate_size(self._guesses) + estimate_size(self._feedbacks)
 
-        return result
+    @property
+    def hard_mode(self) -> bool:
+        return self._constraints is not None
+
+    @property
+    def dict_name(self) -> str:
+        return self._dict_name
 
     @property
     def answer(self) -> str:
         return self._answer
 
     @property
-    def valid_words(self) -> list[str]:
+    def valid_words(self) -> AbstractSet[str]:
         return self._valid_words
 
     @property
@@ -117,6 +265,22 @@ class WordleClassic(WordleBase):
     def guesses(self) -> list[str]:
         return self._guesses
 
+    @property
+    def players(self) -> dict[str, str]:
+        return self._players
+
+    @property
+    def board_count(self) -> int:
+        return 1
+
+    @property
+    def solved_count(self) -> int:
+        return 1 if self.is_won else 0
+
+    @property
+    def open_boards(self) -> list[list[list[int]]]:
+        return [] if self.is_won else [self._feedbacks]
+
     @property
     def is_game_over(self):
         if not self._guesses:
@@ -0,0 +1,60 @@
+from collections.abc import Set as AbstractSet
+from datetime import date
+from typing import Any
+
+from .daily import DailyPuzzle  # type: ignore
+from .render import SYNC_RENDERER, RenderExecutor  # type: ignore
+from .wordle_classic import WordleClassic  # type: ignore
+
+
+class WordleDaily(WordleClassic):
+    """每日挑战的对局，答案和反馈来自当天各会话共享的DailyPuzzle"""
+
+    kind = "daily"
+
+    def __init__(
+        self,
+        puzzle: DailyPuzzle,
+        renderer: RenderExecutor = SYNC_RENDERER,
+        hard_mode: bool = False,
+    ):
+        super().__init__(
+            puzzle.answer, puzzle.valid_words, renderer, puzzle.dict_name, hard_mode
+        )
+        self._puzzle = puzzle
+
+    def _score(self, word: str) -> list[int]:
+        return self._puzzle.feedback(word)
+
+    def to_state(self) -> dict[str, Any]:
+        state = super().to_state()
+        state["day"] = self._puzzle.day.isoformat()
+        state["number"] = self._puzzle.number
+        return state
+
+    @classmethod
+    def from_state(
+        cls,
+        state: dict[str, Any],
+        valid_words: AbstractSet[str],
+        renderer: RenderExecutor = SYNC_RENDERER,
+    ) -> "WordleDaily":
+        # 恢复的对局不持有当天的反馈表，改为逐次评分，结果相同
+        puzzle = DailyPuzzle(
+            date.fromisoformat(state["day"]),
+            state["number"],
+            state["answer"],
+            state["dict"],
+            valid_words,
+        )
+        game = cls(puzzle, renderer, state.get("hard", False))
+        game._replay(state)
+        return game
+
+    @property
+    def day(self) -> date:
+        return self._puzzle.day
+
+    @property
+    def number(self) -> int:
+        return self._puzzle.number
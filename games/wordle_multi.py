@@ -0,0 +1,594 @@
+import math
+import threading
+import time
+import weakref
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Any
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .common import WordleBase, estimate_size  # type: ignore
+from .constraints import HardModeConstraints  # type: ignore
+from .encode import EncodedImage, EncoderOptions, encode_image  # type: ignore
+from .metrics import METRICS  # type: ignore
+from .render import SYNC_RENDERER, RenderExecutor  # type: ignore
+from .scoring import AnswerBlock  # type: ignore
+from .text_board import feedback_emoji, keyboard_line  # type: ignore
+
+MIN_BOARDS = 2
+MAX_BOARDS = 32
+BOARD_NAMES = {
+    2: "Dordle",
+    4: "Quordle",
+    8: "Octordle",
+    16: "Sedecordle",
+    32: "Duotrigordle",
+}
+
+MAX_CELL = 50
+MIN_CELL = 12
+MIN_KEY = 36
+# 单张图片的像素上限，棋盘较多时缩小格子以保持在预算内
+DEFAULT_PIXEL_BUDGET = 4_000_000
+
+CELL_COLORS = {
+    2: (106, 170, 100),
+    1: (201, 180, 88),
+    0: (120, 124, 126),
+    -1: (211, 214, 218),
+}
+BACKGROUND_COLOR = (255, 255, 255)
+KEYBOARD_COLORS = {
+    2: CELL_COLORS[2],
+    1: CELL_COLORS[1],
+    0: (211, 214, 218),
+}
+KEYBOARD_ROWS = ["QWERTYUIOP", "ASDFGHJKL", "ZXCVBNM"]
+PALETTE_COLORS = (*CELL_COLORS.values(), BACKGROUND_COLOR, (0, 0, 0))
+
+
+def default_max_guesses(boards: int) -> int:
+    return boards + 5
+
+
+@dataclass(frozen=True)
+class BoardLayout:
+    """N个棋盘按columns列排列，下方是按棋盘分区着色的键盘"""
+
+    boards: int
+    length: int
+    max_guesses: int
+    columns: int
+    cell: int
+
+    @cached_property
+    def padding(self) -> int:
+        return max(2, self.cell // 5)
+
+    @cached_property
+    def rows(self) -> int:
+        return math.ceil(self.boards / self.columns)
+
+    @cached_property
+    def font_size(self) -> int:
+        return self.cell * 3 // 5
+
+    @cached_property
+    def grid_width(self) -> int:
+        return self.cell * self.length + self.padding * (self.length + 1)
+
+    @cached_property
+    def grid_height(self) -> int:
+        return self.cell * self.max_guesses + self.padding * (self.max_guesses + 1)
+
+    @cached_property
+    def key(self) -> int:
+        # 键盘宽度约为棋盘区域的一半，棋盘较多时按键也能看清各棋盘的分区
+        grids_width = self.columns * (self.grid_width + self.padding)
+        return max(self.cell, MIN_KEY, grids_width // 20)
+
+    @cached_property
+    def key_stride(self) -> int:
+        return self.key + self.padding // 2
+
+    @cached_property
+    def width(self) -> int:
+        grids = self.columns * (self.grid_width + self.padding) + self.padding
+        keyboard = len(KEYBOARD_ROWS[0]) * self.key_stride + self.padding * 2
+        return max(grids, keyboard)
+
+    @cached_property
+    def keyboard_y(self) -> int:
+        return self.padding * 2 + self.rows * (self.grid_height + self.padding)
+
+    @cached_property
+    def height(self) -> int:
+        return self.keyboard_y + len(KEYBOARD_ROWS) * self.key_stride + self.padding
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    def grid_origin(self, grid_idx: int) -> tuple[int, int]:
+        grids_width = self.columns * (self.grid_width + self.padding) - self.padding
+        start_x = (self.width - grids_width) // 2
+        return (
+            start_x + (grid_idx % self.columns) * (self.grid_width + self.padding),
+            self.padding
+            + (grid_idx // self.columns) * (self.grid_height + self.padding),
+        )
+
+    def cell_origin(self, grid_idx: int, row: int, col: int) -> tuple[int, int]:
+        grid_x, grid_y = self.grid_origin(grid_idx)
+        return (
+            grid_x + self.padding + col * (self.cell + self.padding),
+            grid_y + self.padding + row * (self.cell + self.padding),
+        )
+
+    def key_origin(self, letter: str) -> tuple[int, int]:
+        for row_idx, keyboard_row in enumerate(KEYBOARD_ROWS):
+            col_idx = keyboard_row.find(letter)
+            if col_idx >= 0:
+                start_x = (self.width - len(keyboard_row) * self.key_stride) // 2
+                return (
+                    start_x + col_idx * self.key_stride,
+                    self.keyboard_y + row_idx * self.key_stride,
+                )
+        raise ValueError(letter)
+
+
+@lru_cache(maxsize=64)
+def board_layout(
+    boards: int,
+    length: int,
+    max_guesses: int,
+    pixel_budget: int = DEFAULT_PIXEL_BUDGET,
+) -> BoardLayout:
+    """列数取使图片最长边最短的值（相同时空位少者优先），格子取不超过像素预算的最大尺寸"""
+
+    def cost(columns: int) -> tuple[int, int]:
+        layout = BoardLayout(boards, length, max_guesses, columns, MAX_CELL)
+        empty = layout.rows * columns - boards
+        return max(layout.width, layout.height), empty
+
+    columns = min(range(1, boards + 1), key=cost)
+    for cell in range(MAX_CELL, MIN_CELL - 1, -1):
+        layout = BoardLayout(boards, length, max_guesses, columns, cell)
+        if layout.pixels <= pixel_budget:
+            break
+    return layout
+
+
+@lru_cache(maxsize=8)
+def get_font(size: int) -> ImageFont.ImageFont | ImageFont.FreeTypeFont:
+    return ImageFont.load_default(size)
+
+
+def _draw_centered(tile: Image.Image, letter: str, size: int, fill: tuple):
+    draw = ImageDraw.Draw(tile)
+    font = get_font(size * 3 // 5)
+    left, top, right, bottom = draw.textbbox((0, 0), letter, font=font)
+    draw.text(
+        ((size - (right - left)) // 2 - left, (size - (bottom - top)) // 2 - top),
+        letter,
+        fill=fill,
+        font=font,
+    )
+
+
+@lru_cache(maxsize=1024)
+def letter_tile(letter: str, feedback_value: int, size: int) -> Image.Image:
+    """预渲染的单个格子，进程内按(字母, 反馈, 尺寸)缓存，只读共享"""
+    tile = Image.new("RGB", (size + 1, size + 1), CELL_COLORS[feedback_value])
+    if letter:
+        _draw_centered(tile, letter, size, (255, 255, 255))
+    return tile
+
+
+@lru_cache(maxsize=2048)
+def key_tile(
+    letter: str, status: tuple[int, ...], size: int, columns: int
+) -> Image.Image:
+    """预渲染的键盘按键，按棋盘的排列方式分区显示该字母在各棋盘中的状态"""
+    tile = Image.new("RGB", (size + 1, size + 1), KEYBOARD_COLORS[0])
+    draw = ImageDraw.Draw(tile)
+
+    rows = math.ceil(len(status) / columns)
+    part_width = size / columns
+    part_height = size / rows
+    for grid_idx, grid_status in enumerate(status):
+        if grid_status > 0:
+            part_x = (grid_idx % columns) * part_width
+            part_y = (grid_idx // columns) * part_height
+            draw.rectangle(
+                [
+                    round(part_x),
+                    round(part_y),
+                    round(part_x + part_width),
+                    round(part_y + part_height),
+                ],
+                fill=KEYBOARD_COLORS[grid_status],
+            )
+
+    _draw_centered(tile, letter, size, (0, 0, 0))
+    return tile
+
+
+@lru_cache(maxsize=16)
+def empty_board(layout: BoardLayout) -> Image.Image:
+    """预绘制的空白棋盘和键盘模板，使用时需要copy"""
+    img = Image.new("RGB", (layout.width, layout.height), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(img)
+
+    empty = letter_tile("", -1, layout.cell)
+    for grid_idx in range(layout.boards):
+        grid_x, grid_y = layout.grid_origin(grid_idx)
+        draw.rectangle(
+            [grid_x, grid_y, grid_x + layout.grid_width, grid_y + layout.grid_height],
+            fill=BACKGROUND_COLOR,
+            outline=(0, 0, 0),
+            width=2,
+        )
+        for row in range(layout.max_guesses):
+            for col in range(layout.length):
+                img.paste(empty, layout.cell_origin(grid_idx, row, col))
+
+    empty_status = (-1,) * layout.boards
+    for keyboard_row in KEYBOARD_ROWS:
+        for letter in keyboard_row:
+            img.paste(
+                key_tile(letter, empty_status, layout.key, layout.columns),
+                layout.key_origin(letter),
+            )
+    return img
+
+
+def paint_rows(
+    img: Image.Image,
+    layout: BoardLayout,
+    start: int,
+    guesses: list[str],
+    feedbacks: list[list[list[int]]],
+    solved_at: dict[int, int],
+):
+    """绘制第start行之后的猜测，只绘制该行猜测时尚未猜中的棋盘"""
+    for row in range(start, len(guesses)):
+        for grid_idx in range(layout.boards):
+            if grid_idx in solved_at and row > solved_at[grid_idx]:
+                continue
+            feedback = feedbacks[row][grid_idx]
+            for col, letter in enumerate(guesses[row]):
+                img.paste(
+                    letter_tile(letter, feedback[col], layout.cell),
+                    layout.cell_origin(grid_idx, row, col),
+                )
+
+
+def paint_keyboard(
+    img: Image.Image,
+    layout: BoardLayout,
+    keyboard_status: dict[str, list[int]],
+    painted: dict[str, tuple[int, ...]],
+):
+    """只重绘状态有变化的按键，painted会被就地更新"""
+    empty_status = (-1,) * layout.boards
+    for letter, status in keyboard_status.items():
+        key_status = tuple(status)
+        if painted.get(letter, empty_status) != key_status:
+            img.paste(
+                key_tile(letter, key_status, layout.key, layout.columns),
+                layout.key_origin(letter),
+            )
+            painted[letter] = key_status
+
+
+def render_board(
+    layout: BoardLayout,
+    guesses: list[str],
+    feedbacks: list[list[list[int]]],
+    solved_at: dict[int, int],
+    keyboard_status: dict[str, list[int]],
+    options: EncoderOptions,
+) -> EncodedImage:
+    """从空白模板完整绘制并编码，只依赖可序列化的参数以便在进程池中执行"""
+    start = time.perf_counter()
+    img = empty_board(layout).copy()
+    paint_rows(img, layout, 0, guesses, feedbacks, solved_at)
+    paint_keyboard(img, layout, keyboard_status, {})
+    return encode_image(img, options, PALETTE_COLORS, time.perf_counter() - start)
+
+
+class WordleMulti(WordleBase):
+    """同时猜N个等长单词，每次猜测对所有未猜中的棋盘生效"""
+
+    kind = "multi"
+
+    def __init__(
+        self,
+        answers: list[str],
+        valid_words: AbstractSet[str],
+        renderer: RenderExecutor = SYNC_RENDERER,
+        dict_name: str = "classic",
+        max_guesses: int | None = None,
+        hard_mode: bool = False,
+    ):
+        self._answers = [answer.upper() for answer in answers]
+        self._block = AnswerBlock(self._answers)
+        self._valid_words = valid_words
+        self._dict_name = dict_name
+        self._length = len(answers[0])
+        self._max_attempts = max_guesses or default_max_guesses(len(answers))
+        self._layout = board_layout(len(answers), self._length, self._max_attempts)
+        self._guesses: list[str] = []
+        self._feedbacks: list[list[list[int]]] = []
+        self._constraints = (
+            [HardModeConstraints(self._length) for _ in answers] if hard_mode else None
+        )
+        self._keyboard_status = {
+            chr(i + ord("A")): [-1] * len(answers) for i in range(26)
+        }
+        # 猜中的棋盘 -> 猜中时的猜测序号，随每次猜测增量更新
+        self._solved_at: dict[int, int] = {}
+        self._players: dict[str, str] = {}
+        self._renderer = renderer
+        # 画布保存在渲染器共享的CanvasCache中，对局结束被回收时一并释放
+        self._canvas_key = renderer.canvases.new_key()
+        weakref.finalize(self, renderer.canvases.discard, self._canvas_key)
+        self._painted_rows = 0
+        self._painted_keys: dict[str, tuple[int, ...]] = {}
+        self._canvas_lock = threading.Lock()
+
+    def _render_incremental(
+        self,
+        guesses: list[str],
+        feedbacks: list[list[list[int]]],
+        solved_at: dict[int, int],
+        keyboard_status: dict[str, list[int]],
+        options: EncoderOptions,
+    ) -> EncodedImage:
+        """在缓存的画布上只补画新增的行和变化的按键，已猜中的棋盘不再重绘，
+        画布已被淘汰时从模板重新绘制"""
+        canvases = self._renderer.canvases
+        with self._canvas_lock:
+            start = time.perf_counter()
+            canvas = canvases.get(self._canvas_key)
+            if canvas is None:
+                canvas = empty_board(self._layout).copy()
+                self._painted_rows = 0
+                self._painted_keys = {}
+            paint_rows(
+                canvas,
+                self._layout,
+                self._painted_rows,
+                guesses,
+                feedbacks,
+                solved_at,
+            )
+            self._painted_rows = max(self._painted_rows, len(guesses))
+            paint_keyboard(canvas, self._layout, keyboard_status, self._painted_keys)
+            canvases.put(self._canvas_key, canvas)
+            return encode_image(
+                canvas, options, PALETTE_COLORS, time.perf_counter() - start
+            )
+
+    async def gen_image(self) -> bytes:
+        guesses = list(self._guesses)
+        feedbacks = [
+            [list(feedback) for feedback in grids] for grids in self._feedbacks
+        ]
+        solved_at = dict(self._solved_at)
+        keyboard_status = {
+            letter: list(status) for letter, status in self._keyboard_status.items()
+        }
+        if self._renderer.shares_memory:
+            return await self._renderer.render(
+                self._render_incremental,
+                guesses,
+                feedbacks,
+                solved_at,
+                keyboard_status,
+            )
+        # 进程池无法持有画布，退回到基于模板的完整绘制
+        return await self._renderer.render(
+            render_board, self._layout, guesses, feedbacks, solved_at, keyboard_status
+        )
+
+    def gen_text(self) -> str:
+        """每个棋盘只显示最近一次猜测的反馈，已猜中的棋盘显示答案和猜中的次数"""
+        if not self._guesses:
+            return ""
+        lines = [f"最近猜测: {self._guesses[-1]}"]
+        for grid_idx, answer in enumerate(self._answers):
+            solved_at = self._solved_at.get(grid_idx)
+            if solved_at is None:
+                row = feedback_emoji(self._feedbacks[-1][grid_idx])
+            else:
+                row = f"✅ {answer} (第{solved_at + 1}次)"
+            lines.append(f"{grid_idx + 1}. {row}")
+
+        # 键盘只统计未猜中的棋盘：任一棋盘中存在即视为存在，全部排除才视为排除
+        open_grids = [
+            grid_idx
+            for grid_idx in range(len(self._answers))
+            if grid_idx not in self._solved_at
+        ]
+        letter_status = {
+            letter: max((status[grid_idx] for grid_idx in open_grids), default=-1)
+            for letter, status in self._keyboard_status.items()
+        }
+        lines.append("键盘: " + keyboard_line(letter_status))
+        lines.append("已猜: " + " ".join(self._guesses))
+        return "\n".join(lines)
+
+    def apply_guess(self, word: str):
+        word = word.upper()
+        self._guesses.append(word)
+
+        with METRICS.timer("score"):
+            grid_feedbacks = self._block.score(word)
+        self._apply_feedbacks(word, grid_feedbacks)
+
+    async def guess(self, word: str) -> bytes:
+        self.apply_guess(word)
+        return await self.gen_image()
+
+    def _apply_feedbacks(self, word: str, grid_feedbacks: list[list[int]]):
+        guess_idx = len(self._feedbacks)
+        self._feedbacks.append(grid_feedbacks)
+
+        for grid_idx, feedback in enumerate(grid_feedbacks):
+            if grid_idx not in self._solved_at and all(
+                value == 2 for value in feedback
+            ):
+                self._solved_at[grid_idx] = guess_idx
+
+            for i, letter in enumerate(word):
+                status = self._keyboard_status[letter]
+                status[grid_idx] = max(status[grid_idx], feedback[i])
+            if self._constraints is not None:
+                self._constraints[grid_idx].add(word, feedback)
+
+    def hard_mode_violation(self, word: str) -> str | None:
+        """多个棋盘的绿色字母通常互相冲突，猜测只需满足任一未猜中棋盘的约束"""
+        constraints = self.hard_mode_constraints()
+        if not constraints:
+            return None
+        violations = []
+        for board in constraints:
+            violation = board.violation(word)
+            if violation is None:
+                return None
+            violations.append(violation)
+        if len(violations) == 1:
+            return violations[0]
+        return "需要满足任一未猜中棋盘的已知信息"
+
+    def hard_mode_constraints(self) -> list[HardModeConstraints]:
+        if self._constraints is None:
+            return []
+        return [
+            constraints
+            for grid_idx, constraints in enumerate(self._constraints)
+            if grid_idx not in self._solved_at
+        ]
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "answers": list(self._answers),
+            "dict": self._dict_name,
+            "max_guesses": self._max_attempts,
+            "hard": self.hard_mode,
+            "players": dict(self._players),
+            "guesses": list(self._guesses),
+            "feedbacks": [list(feedback) for feedback in self._feedbacks],
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        state: dict[str, Any],
+        valid_words: AbstractSet[str],
+        renderer: RenderExecutor = SYNC_RENDERER,
+    ) -> "WordleMulti":
+        game = cls(
+            state["answers"],
+            valid_words,
+            renderer,
+            state["dict"],
+            state.get("max_guesses"),
+            state.get("hard", False),
+        )
+        for word, grid_feedbacks in zip(state["guesses"], state["feedbacks"]):
+            game._guesses.append(word)
+            game._apply_feedbacks(word, grid_feedbacks)
+        game._players = dict(state.get("players", {}))
+        return game
+
+    def memory_usage(self) -> int:
+        return (
+            estimate_size(self._guesses)
+            + estimate_size(self._feedbacks)
+            + estimate_size(self._keyboard_status)
+            + estimate_size(self._painted_keys)
+        )
+
+    @property
+    def name(self) -> str:
+        return BOARD_NAMES.get(len(self._answers), f"{len(self._answers)}-Wordle")
+
+    @property
+    def layout(self) -> BoardLayout:
+        return self._layout
+
+    @property
+    def board_count(self) -> int:
+        return len(self._answers)
+
+    @property
+    def solved_at(self) -> dict[int, int]:
+        return self._solved_at
+
+    @property
+    def remaining_answers(self) -> list[str]:
+        return [
+            answer
+            for grid_idx, answer in enumerate(self._answers)
+            if grid_idx not in self._solved_at
+        ]
+
+    @property
+    def hard_mode(self) -> bool:
+        return self._constraints is not None
+
+    @property
+    def dict_name(self) -> str:
+        return self._dict_name
+
+    @property
+    def answer(self) -> str:
+        return "/".join(self._answers)
+
+    @property
+    def valid_words(self) -> AbstractSet[str]:
+        return self._valid_words
+
+    @property
+    def length(self) -> int:
+        return self._length
+
+    @property
+    def max_attempts(self) -> int:
+        return self._max_attempts
+
+    @property
+    def guesses(self) -> list[str]:
+        return self._guesses
+
+    @property
+    def players(self) -> dict[str, str]:
+        return self._players
+
+    @property
+    def solved_count(self) -> int:
+        return len(self._solved_at)
+
+    @property
+    def open_boards(self) -> list[list[list[int]]]:
+        return [
+            [grids[grid_idx] for grids in self._feedbacks]
+            for grid_idx in range(len(self._answers))
+            if grid_idx not in self._solved_at
+        ]
+
+    @property
+    def is_game_over(self):
+        if not self._guesses:
+            return False
+        return len(self._guesses) >= self._max_attempts or self.is_won
+
+    @property
+    def is_won(self):
+        return len(self._solved_at) == len(self._answers)
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from collections.abc import Callable, Sized
+from typing import Any
+
+# 视为暂时性I/O故障的异常，批次放回队列下个周期重试；
+# 其他异常说明这批数据本身无法写入，重试也不会成功，报告后丢弃
+RETRY_ERRORS = (sqlite3.Error, OSError)
+
+
+class BatchDropped(Exception):
+    """一批待写记录因非I/O错误被丢弃，通过on_error报告"""
+
+
+class WriteBehindStore:
+    """后台按批写入SQLite的存储
+
+    子类把待写记录放入自己的队列后调用start_flusher，并实现flush：取出一批，
+    交给_write_batch在线程中写入。后台任务每flush_interval秒写入一次，
+    close时写入剩余的记录并关闭连接
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float,
+        on_error: Callable[[Exception], None] | None = None,
+    ):
+        self._path = path
+        self._flush_interval = flush_interval
+        self._on_error = on_error
+        self._conn: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._flusher: asyncio.Task | None = None
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        raise NotImplementedError
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    def open(self):
+        with self._db_lock:
+            self._connect()
+
+    async def flush(self):
+        raise NotImplementedError
+
+    async def _write_batch(
+        self,
+        write: Callable[[Any], Any],
+        batch: Sized,
+        requeue: Callable[[Any], None],
+    ) -> Any:
+        """在线程中执行write(batch)并返回其结果
+
+        I/O错误时调用requeue把批次放回队列并抛出；其他错误报告后丢弃该批次，返回None
+        """
+        try:
+            return await asyncio.to_thread(write, batch)
+        except RETRY_ERRORS:
+            requeue(batch)
+            raise
+        except Exception as e:
+            self._report(BatchDropped(f"写入出错，已丢弃{len(batch)}条记录: {e!r}"))
+            return None
+
+    def _report(self, error: Exception):
+        if self._on_error is not None:
+            self._on_error(error)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                # 任何错误都不能结束后台任务，I/O错误的批次已放回队列
+                self._report(e)
+
+    def start_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
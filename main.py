@@ -1,26 +1,97 @@
+import asyncio
+import base64
 import os
-import random
-import re
+import time
+from collections.abc import Set as AbstractSet
+from contextlib import aclosing
 
-from astrbot.api import logger
+from astrbot.api import AstrBotConfig, logger
 from astrbot.api.event import AstrMessageEvent, filter
 from astrbot.api.star import Context, Star, register
 from astrbot.core.message.message_event_result import MessageChain
 from astrbot.core.star.filter.event_message_type import EventMessageType
 
 from .games.common import WordleBase  # type: ignore
+from .games.daily import DailyChallenge  # type: ignore
+from .games.dictionary import DictionaryRegistry  # type: ignore
+from .games.encode import EncoderOptions, ImageEncoder  # type: ignore
+from .games.guess_queue import GuessQueue, PendingGuess  # type: ignore
+from .games.metrics import METRICS  # type: ignore
+from .games.persistence import SessionPersistence  # type: ignore
+from .games.player_stats import (  # type: ignore
+    GLOBAL_SCOPE,
+    MIN_RATE_GAMES,
+    RANK_NAMES,
+    RANK_ORDERS,
+    SESSION_TOTAL,
+    GameRecord,
+    PlayerStatsStore,
+    StatsRow,
+)
+from .games.render import RenderExecutor  # type: ignore
+from .games.sessions import SessionChoices, SessionStore  # type: ignore
+from .games.solver import (  # type: ignore
+    MAX_HINT_WORDS,
+    OPENING_WARMUP_MAX_WORDS,
+    HintEngine,
+)
+from .games.spool import ImageSpool  # type: ignore
+from .games.text_board import BOARD_MODES, ImageLatency  # type: ignore
+from .games.warmup import (  # type: ignore
+    WarmupStatus,
+    warm_fonts,
+    warm_renderer,
+    warm_templates,
+)
 from .games.wordle_classic import WordleClassic  # type: ignore
+from .games.wordle_daily import WordleDaily  # type: ignore
+from .games.wordle_multi import MAX_BOARDS, MIN_BOARDS, WordleMulti  # type: ignore
 from .games.worlde_octordle import WordleOctordle  # type: ignore
 
+GAME_TYPES: dict[str, type[WordleClassic] | type[WordleMulti]] = {
+    WordleClassic.kind: WordleClassic,
+    WordleDaily.kind: WordleDaily,
+    WordleOctordle.kind: WordleOctordle,
+    WordleMulti.kind: WordleMulti,
+}
+
 IGNORGE_MSG = [
     "wordle start",
     "wordle stop",
     "wordle hint",
     "wordle octordle",
+    "wordle multi",
     "wordle dict",
+    "wordle stats",
+    "wordle board",
+    "wordle rank",
+    "wordle daily",
 ]
 
 
+def format_stats(title: str, row: StatsRow | None) -> str:
+    if row is None or not row.played:
+        return f"{title}: 暂无记录"
+    summary = (
+        f"{title}: {row.played}局，胜{row.won}局（{row.win_rate:.0%}），"
+        f"当前连胜{row.current_streak}，最长连胜{row.best_streak}"
+    )
+    lines = [summary]
+    if row.distribution:
+        most = max(row.distribution.values())
+        lines.append("猜中所用次数:")
+        for guesses in sorted(row.distribution):
+            count = row.distribution[guesses]
+            bar = "█" * max(1, round(count / most * 10))
+            lines.append(f"{guesses}: {bar} {count}")
+    if row.multi_played:
+        lines.append(
+            f"多棋盘: {row.multi_played}局，猜中{row.boards_solved}/"
+            f"{row.boards_played}个棋盘（{row.completion:.0%}）"
+        )
+    return "\n".join(lines)
+
+
 @register(
     "astrbot_plugin_wordle",
     "Raven95676",
@@ -29,33 +100,284 @@ IGNORGE_MSG = [
     "https://github.com/Raven95676/astrbot_plugin_wordle",
 )
 class PluginWordle(Star):
-    def __init__(self, context: Context):
+    def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
-        self.game_sessions: dict[str, WordleBase] = {}
-        self.current_dict = "classic"
+        self.config = config
+        self.game_sessions = SessionStore(
+            self.config.get("session_ttl_minutes", 30) * 60,
+            self.config.get("max_sessions", 1000),
+            self.on_session_expired,
+        )
+        self.persistence = self._create_persistence()
+        self.player_stats = self._create_player_stats()
+        self._restore_lock = asyncio.Lock()
+        self.guess_queue = GuessQueue(
+            self.config.get("guess_batch_window_ms", 0) / 1000
+        )
         self.dict_folder = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "dict"
         )
+        self.dictionaries = DictionaryRegistry(
+            self.dict_folder,
+            self.config.get("dict_idle_unload_minutes", 10) * 60,
+            self.config.get("stream_threshold_mb", 64) << 20,
+        )
+        data_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        self.dict_choices = SessionChoices(
+            os.path.join(data_folder, "dict_choices.json")
+        )
+        self.board_modes = SessionChoices(os.path.join(data_folder, "board_modes.json"))
+        self.image_latency = ImageLatency(
+            self.config.get("auto_text_threshold_ms", 3000) / 1000,
+            self.config.get("auto_image_retry_seconds", 300),
+        )
+        self.daily = DailyChallenge(
+            self.dictionaries,
+            self.config.get("daily_length", 5),
+            self.config.get("daily_utc_offset", 8),
+            self.config.get("daily_seed", "wordle"),
+            self.config.get("daily_results_refresh_seconds", 60),
+        )
+        self.renderer = self._create_renderer()
+        self.spool = ImageSpool()
+        self.hints = HintEngine(
+            self.dictionaries.cache_folder,
+            self.config.get("hint_time_budget_ms", 300) / 1000,
+        )
+        self.warmup = WarmupStatus()
+        self._warmup_task: asyncio.Task | None = None
+        if self.config.get("warmup_enabled", True):
+            try:
+                self._warmup_task = asyncio.get_running_loop().create_task(
+                    self.warm_up()
+                )
+            except RuntimeError:
+                logger.debug("没有运行中的事件循环，跳过预热")
+        try:
+            self.start_metrics_exporter()
+        except RuntimeError:
+            logger.debug("没有运行中的事件循环，不导出指标")
+
+    async def warm_up(self):
+        """后台预热渲染和词典，各阶段完成后更新self.warmup，命令不会等待预热"""
+        self.warmup.started_at = time.time()
+        lengths = tuple(self.config.get("warmup_lengths", [4, 5, 6, 7, 8]))
+        options = self.renderer.encoder.options
+        try:
+            if self.renderer.shares_memory:
+                await asyncio.to_thread(warm_fonts)
+                self.warmup.mark("fonts")
+                await asyncio.to_thread(warm_templates, lengths, options)
+            else:
+                # 进程池中每个渲染进程各自持有字体和模板缓存
+                await asyncio.gather(
+                    *(
+                        self.renderer.run(warm_renderer, lengths, options)
+                        for _ in range(self.renderer.workers)
+                    )
+                )
+                self.warmup.mark("fonts")
+            self.warmup.mark("templates")
+        except Exception as e:
+            logger.warning(f"预热渲染失败: {e!s}")
+            self.warmup.fail("templates", e)
 
-    async def get_answers(
-        self, length, count: int = 1
-    ) -> tuple[list[str], list[str]] | None:
+        names = {
+            self.config.get("default_dict", "classic")
+        } | self.dict_choices.values()
+        try:
+            for name in sorted(names):
+                if self.dictionaries.exists(name):
+                    await asyncio.to_thread(self.dictionaries.get, name)
+            self.warmup.mark("dictionaries")
+        except Exception as e:
+            logger.warning(f"预热词典失败: {e!s}")
+            self.warmup.fail("dictionaries", e)
+
+        try:
+            await self.daily.puzzle(self.daily_dict())
+            self.warmup.mark("daily")
+        except Exception as e:
+            logger.warning(f"预热每日挑战失败: {e!s}")
+            self.warmup.fail("daily", e)
+
+        try:
+            await self.warm_openings(sorted(names), lengths)
+            self.warmup.mark("openings")
+        except Exception as e:
+            logger.warning(f"预计算开局提示失败: {e!s}")
+            self.warmup.fail("openings", e)
+
+        self.warmup.finished_at = time.time()
+        logger.info(self.warmup.summary())
+
+    async def warm_openings(self, names: list[str], lengths: tuple[int, ...]):
+        """为较小的分桶预先计算开局提示，大分桶需用 python games/solver.py 离线计算"""
+        for name in names:
+            if not self.dictionaries.exists(name):
+                continue
+            loaded = await asyncio.to_thread(self.dictionaries.get, name)
+            for length in lengths:
+                words = loaded.lookup(length)
+                if 0 < len(words) <= OPENING_WARMUP_MAX_WORDS:
+                    await asyncio.to_thread(self.hints.precompute_opening, words)
+
+    def _create_renderer(self) -> RenderExecutor:
+        mode = self.config.get("render_mode", "thread")
+        workers = self.config.get("render_workers", 2)
+        queue_size = self.config.get("render_queue_size", 8)
+        canvas_budget = self.config.get("canvas_cache_mb", 64) << 20
+        try:
+            options = EncoderOptions(
+                self.config.get("image_format", "png-palette"),
+                self.config.get("image_compress_level", 6),
+                self.config.get("image_scale", 1.0),
+            )
+        except ValueError as e:
+            logger.error(f"图片编码配置无效，改为默认配置: {e!s}")
+            options = EncoderOptions()
+        encoder = ImageEncoder(options)
+        try:
+            return RenderExecutor(mode, workers, queue_size, encoder, canvas_budget)
+        except Exception as e:
+            logger.error(f"创建渲染执行器失败，改为同步渲染: {e!s}")
+            return RenderExecutor("sync", encoder=encoder, canvas_budget=canvas_budget)
+
+    def _create_persistence(self) -> SessionPersistence | None:
+        if not self.config.get("session_persistence", True):
+            return None
+        path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "data", "sessions.db"
+        )
+        persistence = SessionPersistence(
+            path,
+            self.config.get("session_flush_interval", 2.0),
+            lambda e: logger.error(f"保存游戏会话失败: {e!s}"),
+        )
+        try:
+            # 只读取会话ID，对局在会话下次发言时才恢复
+            persistence.open(self.config.get("session_ttl_minutes", 30) * 60)
+        except Exception as e:
+            logger.error(f"打开会话数据库失败，不再保存游戏进度: {e!s}")
+            return None
+        return persistence
+
+    def _create_player_stats(self) -> PlayerStatsStore | None:
+        if not self.config.get("player_stats", True):
+            return None
+        path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "data", "player_stats.db"
+        )
+        store = PlayerStatsStore(
+            path,
+            self.config.get("stats_flush_interval", 5.0),
+            lambda e: logger.error(f"保存玩家战绩失败: {e!s}"),
+        )
+        try:
+            store.open()
+        except Exception as e:
+            logger.error(f"打开战绩数据库失败，不再记录战绩: {e!s}")
+            return None
+        return store
+
+    async def get_session(self, session_id: str) -> WordleBase | None:
+        game = self.game_sessions.get(session_id)
+        if game is not None or self.persistence is None:
+            return game
+        if not self.persistence.has(session_id):
+            return None
+        async with self._restore_lock:
+            game = self.game_sessions.get(session_id)
+            if game is None:
+                game = await self.restore_session(session_id)
+            return game
+
+    async def restore_session(self, session_id: str) -> WordleBase | None:
         try:
-            wordlist_path = os.path.join(self.dict_folder, f"{self.current_dict}.txt")
+            loaded = await self.persistence.load(session_id)
+            if loaded is None:
+                return None
+            state, updated_at = loaded
+            ttl = self.config.get("session_ttl_minutes", 30) * 60
+            if ttl > 0 and time.time() - updated_at > ttl:
+                self.persistence.delete(session_id)
+                return None
+
+            game_type = GAME_TYPES[state["kind"]]
+            dictionary = await asyncio.to_thread(self.dictionaries.get, state["dict"])
+            answers = state.get("answers") or [state["answer"]]
+            words = dictionary.lookup(len(answers[0]))
+            game = game_type.from_state(state, words, self.renderer)
+        except Exception as e:
+            logger.error(f"恢复游戏会话失败: {e!s}")
+            self.persistence.delete(session_id)
+            return None
+
+        self.game_sessions.put(session_id, game)
+        self.dictionaries.acquire(game.dict_name)
+        logger.debug(f"已恢复会话 {session_id} 的游戏")
+        return game
+
+    def start_session(self, session_id: str, game: WordleBase):
+        self.end_session(session_id)
+        self.dictionaries.acquire(game.dict_name)
+        self.save_session(session_id, game)
+
+    def save_session(self, session_id: str, game: WordleBase):
+        self.game_sessions.put(session_id, game)
+        if self.persistence is not None:
+            self.persistence.save(session_id, game)
+
+    def end_session(self, session_id: str) -> WordleBase | None:
+        if self.persistence is not None:
+            self.persistence.delete(session_id)
+        game = self.game_sessions.pop(session_id)
+        if game is not None:
+            self.dictionaries.release(game.dict_name)
+            self.forfeit_daily(session_id, game)
+        return game
+
+    def forfeit_daily(self, session_id: str, game: WordleBase):
+        """未完成就被中止、替换或过期的每日挑战记为失败，当天不能重新开始"""
+        if isinstance(game, WordleDaily) and not game.is_game_over:
+            self.daily.record(session_id, game)
+
+    def session_dict(self, session_id: str) -> str:
+        """会话选择的词典，未选择或已被删除时使用全局默认词典"""
+        name = self.dict_choices.get(session_id)
+        if name is not None and self.dictionaries.exists(name):
+            return name
+        return self.config.get("default_dict", "classic")
+
+    def daily_dict(self) -> str:
+        """每日挑战使用的词典，未配置时使用全局默认词典，与会话选择的词典无关"""
+        return self.config.get("daily_dict", "") or self.config.get(
+            "default_dict", "classic"
+        )
 
-            with open(wordlist_path, "r", encoding="utf-8") as file:
-                content = file.read()
-                words = content.split()
-                filtered_words = [
-                    word.strip().upper()
-                    for word in words
-                    if len(word.strip()) == length
-                ]
+    def session_board_mode(self, session_id: str) -> str:
+        mode = self.board_modes.get(session_id)
+        if mode in BOARD_MODES:
+            return mode
+        return self.config.get("board_mode", "image")
 
-                if not filtered_words:
-                    return None
+    def use_text_board(self, session_id: str, platform: str) -> bool:
+        mode = self.session_board_mode(session_id)
+        if mode == "auto":
+            return self.image_latency.prefers_text(platform)
+        return mode == "text"
+
+    async def get_answers(
+        self, length, count: int = 1, dict_name: str = "classic"
+    ) -> tuple[list[str], AbstractSet[str]] | None:
+        try:
+            with METRICS.timer("dict_load"):
+                loaded = await asyncio.to_thread(self.dictionaries.get, dict_name)
+            words = loaded.lookup(length)
+            if len(words) < count:
+                return None
 
-                return random.sample(filtered_words, count), filtered_words
+            return loaded.sample(length, count), words
         except Exception as e:
             logger.error(f"加载词表失败: {e!s}")
             return None
@@ -65,62 +387,168 @@ class PluginWordle(Star):
         pass
 
     @wordle.command("start")
-    async def start_wordle(self, event: AstrMessageEvent, length: int = 5):
-        """开始Wordle游戏"""
-        result = await self.get_answers(length, 1)
+    async def start_wordle(
+        self, event: AstrMessageEvent, length: int = 5, mode: str = ""
+    ):
+        """开始Wordle游戏，wordle start 5 hard 为困难模式"""
         session_id = event.unified_msg_origin
-
-        if session_id in self.game_sessions:
-            del self.game_sessions[session_id]
+        dict_name = self.session_dict(session_id)
+        result = await self.get_answers(length, 1, dict_name)
 
         if not result:
+            self.end_session(session_id)
             yield event.plain_result(f"未找到长度为{length}的单词")
             return
 
         answer, filtered_words = result
-        game = WordleClassic(answer[0], filtered_words)
-        self.game_sessions[session_id] = game
-        yield event.plain_result("游戏已开始，请输入猜测")
+        game = WordleClassic(
+            answer[0], filtered_words, self.renderer, dict_name, mode == "hard"
+        )
+        self.start_session(session_id, game)
+        METRICS.incr("games_started")
+        yield event.plain_result(f"{self.mode_label(game)}游戏已开始，请输入猜测")
         logger.debug(f"答案是：{answer}")
 
     @wordle.command("octordle")
-    async def start_octordle(self, event: AstrMessageEvent):
-        """开始Octordle游戏"""
-        result = await self.get_answers(5, 8)
+    async def start_octordle(self, event: AstrMessageEvent, mode: str = ""):
+        """开始Octordle游戏，wordle octordle hard 为困难模式"""
         session_id = event.unified_msg_origin
-
-        if session_id in self.game_sessions:
-            del self.game_sessions[session_id]
+        dict_name = self.session_dict(session_id)
+        result = await self.get_answers(5, 8, dict_name)
 
         if not result:
+            self.end_session(session_id)
             yield event.plain_result("未找到足够的单词")
             return
 
         answers, filtered_words = result
-        game = WordleOctordle(answers, filtered_words)
-        self.game_sessions[session_id] = game
-        yield event.plain_result("Octordle游戏已开始，请输入猜测")
+        game = WordleOctordle(
+            answers, filtered_words, self.renderer, dict_name, hard_mode=mode == "hard"
+        )
+        self.start_session(session_id, game)
+        METRICS.incr("games_started")
+        yield event.plain_result(
+            f"{self.mode_label(game)}Octordle游戏已开始，请输入猜测"
+        )
         logger.debug(f"答案是：{answers}")
 
+    @wordle.command("multi")
+    async def start_multi(
+        self,
+        event: AstrMessageEvent,
+        boards: int = 4,
+        length: int = 5,
+        mode: str = "",
+    ):
+        """开始多棋盘Wordle，例如 wordle multi 4 为Quordle，wordle multi 16 6"""
+        if not MIN_BOARDS <= boards <= MAX_BOARDS:
+            yield event.plain_result(f"棋盘数应在{MIN_BOARDS}到{MAX_BOARDS}之间")
+            return
+
+        session_id = event.unified_msg_origin
+        dict_name = self.session_dict(session_id)
+        result = await self.get_answers(length, boards, dict_name)
+
+        if not result:
+            self.end_session(session_id)
+            yield event.plain_result(f"未找到{boards}个长度为{length}的单词")
+            return
+
+        answers, filtered_words = result
+        game = WordleMulti(
+            answers, filtered_words, self.renderer, dict_name, hard_mode=mode == "hard"
+        )
+        self.start_session(session_id, game)
+        METRICS.incr("games_started")
+        yield event.plain_result(
+            f"{self.mode_label(game)}{game.name}游戏已开始（{boards}个{length}位单词，"
+            f"共{game.max_attempts}次机会），请输入猜测"
+        )
+        logger.debug(f"答案是：{answers}")
+
+    @wordle.command("daily")
+    async def start_daily(self, event: AstrMessageEvent, action: str = ""):
+        """每日挑战，所有会话当天答案相同；wordle daily hard 为困难模式，
+        wordle daily result 查看今日各会话的结果"""
+        session_id = event.unified_msg_origin
+        try:
+            puzzle = await self.daily.puzzle(self.daily_dict())
+        except Exception as e:
+            logger.error(f"生成每日挑战失败: {e!s}")
+            yield event.plain_result("每日挑战生成失败")
+            return
+
+        if action in ("result", "results"):
+            await self.send_daily_results(event)
+            return
+        if self.daily.completed(session_id):
+            await self.send_daily_results(event, "本会话今天已完成每日挑战")
+            return
+        game = await self.get_session(session_id)
+        if isinstance(game, WordleDaily) and game.day == puzzle.day:
+            yield event.plain_result(
+                f"每日挑战 #{puzzle.number} 正在进行，"
+                f"已猜测 {len(game.guesses)}/{game.max_attempts} 次"
+            )
+            return
+
+        game = WordleDaily(puzzle, self.renderer, action == "hard")
+        self.start_session(session_id, game)
+        METRICS.incr("games_started")
+        yield event.plain_result(
+            f"{self.mode_label(game)}每日挑战 #{puzzle.number}"
+            f"（{puzzle.day.isoformat()}）已开始，共{game.max_attempts}次机会，请输入猜测"
+        )
+
+    async def send_daily_results(self, event: AstrMessageEvent, note: str = ""):
+        """发送当天结果，图片模式下所有会话共用同一张缓存的图片"""
+        prefix = f"{note}\n" if note else ""
+        results = self.daily.results()
+        if results is None:
+            await event.send(
+                MessageChain().message(f"{prefix}今天还没有会话完成每日挑战")
+            )
+            return
+
+        session_id = event.unified_msg_origin
+        if self.use_text_board(session_id, event.get_platform_name()):
+            await event.send(MessageChain().message(prefix + results.text()))
+            return
+        try:
+            image = await self.daily.results_image(self.renderer)
+        except Exception as e:
+            logger.error(f"绘制每日挑战结果失败: {e!s}")
+            image = None
+        if image is None:
+            await event.send(MessageChain().message(prefix + results.text()))
+            return
+        await self.send_board(event, image, prefix + results.summary())
+
+    @staticmethod
+    def mode_label(game: WordleBase) -> str:
+        return "困难模式" if game.hard_mode else ""
+
     @wordle.command("stop")
     async def stop_wordle(self, event: AstrMessageEvent):
         """中止Wordle游戏"""
         session_id = event.unified_msg_origin
-        if session_id in self.game_sessions:
-            del self.game_sessions[session_id]
+        if await self.get_session(session_id) is not None:
+            self.end_session(session_id)
             yield event.plain_result("已结束当前游戏")
         else:
             yield event.plain_result("当前未开始游戏")
 
     @wordle.command("hint")
-    async def give_hint(self, event: AstrMessageEvent):
-        """获取提示（第一个字母）"""
-        session_id = event.unified_msg_origin
-        if session_id not in self.game_sessions:
+    async def give_hint(self, event: AstrMessageEvent, mode: str = ""):
+        """获取提示（第一个字母），wordle hint smart 获取推荐猜测"""
+        game = await self.get_session(event.unified_msg_origin)
+        if game is None:
             yield event.plain_result("当前未开始游戏")
             return
 
-        game = self.game_sessions[session_id]
+        if mode == "smart":
+            yield event.plain_result(await self.smart_hint(game))
+            return
 
         if isinstance(game, WordleClassic):
             hint = f"提示: 第一个字母是 {game.answer[0]}"
@@ -131,6 +559,142 @@ class PluginWordle(Star):
             hint_text = "提示: 第一个字母\n" + "\n".join(hints)
             yield event.plain_result(hint_text)
 
+    async def smart_hint(self, game: WordleBase) -> str:
+        if len(game.valid_words) > MAX_HINT_WORDS:
+            return "当前词典过大，不支持智能提示"
+        histories = [
+            list(zip(game.guesses, feedbacks)) for feedbacks in game.open_boards
+        ]
+        try:
+            hint = await asyncio.to_thread(
+                self.hints.suggest,
+                game.valid_words,
+                histories,
+                game.hard_mode_constraints(),
+            )
+        except Exception as e:
+            logger.error(f"计算提示失败: {e!s}")
+            return "计算提示失败"
+
+        if hint is None:
+            return "没有找到符合条件的单词"
+
+        msg = f"推荐猜测: {hint.guess}（期望信息量 {hint.entropy:.2f} bit）\n"
+        if len(hint.remaining) == 1:
+            msg += f"剩余候选: {hint.remaining[0]}个"
+        else:
+            msg += "各棋盘剩余候选: " + "/".join(str(n) for n in hint.remaining)
+        if not hint.complete:
+            msg += f"\n（限时内评估了{hint.evaluated}/{hint.total}个单词）"
+        return msg
+
+    @wordle.command("stats")
+    async def show_stats(self, event: AstrMessageEvent, target: str = ""):
+        """wordle stats me 查看个人战绩，wordle stats group 查看本会话战绩，
+        wordle stats 查看各阶段耗时与计数（管理员）"""
+        if target in ("me", "group"):
+            yield event.plain_result(await self.player_summary(event, target))
+            return
+        if not event.is_admin():
+            yield event.plain_result(
+                "只有管理员可以查看运行统计，个人战绩请使用 /wordle stats me"
+            )
+            return
+
+        msg = METRICS.summary(self.metrics_gauges())
+        msg += "\n" + self.warmup.summary()
+        encoder_summary = self.renderer.encoder.summary()
+        if encoder_summary:
+            msg += "\n图片编码:\n" + encoder_summary
+        yield event.plain_result(msg)
+
+    async def player_summary(self, event: AstrMessageEvent, target: str) -> str:
+        if self.player_stats is None:
+            return "未开启战绩记录"
+        session_id = event.unified_msg_origin
+        try:
+            if target == "group":
+                row = await self.player_stats.get(session_id, SESSION_TOTAL)
+                return format_stats("本会话战绩", row)
+            user_id = event.get_sender_id()
+            local = await self.player_stats.get(session_id, user_id)
+            overall = await self.player_stats.get(GLOBAL_SCOPE, user_id)
+        except Exception as e:
+            logger.error(f"读取玩家战绩失败: {e!s}")
+            return "读取战绩失败"
+        return (
+            format_stats("本会话中的战绩", local)
+            + "\n\n"
+            + format_stats("全部战绩", overall)
+        )
+
+    @wordle.command("rank")
+    async def show_rank(self, event: AstrMessageEvent, order: str = "wins"):
+        """本会话排行榜，可按 wins（胜场）、rate（胜率）、streak（最长连胜）排序"""
+        if self.player_stats is None:
+            yield event.plain_result("未开启战绩记录")
+            return
+        if order not in RANK_ORDERS:
+            yield event.plain_result(f"未知的排行方式，可选: {', '.join(RANK_ORDERS)}")
+            return
+
+        try:
+            ranking = await self.player_stats.leaderboard(
+                event.unified_msg_origin, order
+            )
+        except Exception as e:
+            logger.error(f"读取排行榜失败: {e!s}")
+            yield event.plain_result("读取排行榜失败")
+            return
+
+        if not ranking:
+            note = f"（至少{MIN_RATE_GAMES}局）" if order == "rate" else ""
+            yield event.plain_result(f"暂无排行数据{note}")
+            return
+        lines = [f"本会话排行（按{RANK_NAMES[order]}）:"]
+        for place, (_, row) in enumerate(ranking, 1):
+            lines.append(
+                f"{place}. {row.name} 胜{row.won}/{row.played}局 "
+                f"({row.win_rate:.0%}) 最长连胜{row.best_streak}"
+            )
+        yield event.plain_result("\n".join(lines))
+
+    def record_result(self, session_id: str, game: WordleBase):
+        if isinstance(game, WordleDaily):
+            self.daily.record(session_id, game)
+        if self.player_stats is None:
+            return
+        self.player_stats.record(
+            GameRecord(
+                session_id,
+                dict(game.players),
+                bool(game.is_won),
+                len(game.guesses),
+                game.board_count,
+                game.solved_count,
+            )
+        )
+
+    def metrics_gauges(self) -> dict[str, float]:
+        stats = self.game_sessions.stats()
+        return {
+            "active_sessions": stats["active"],
+            "expired_sessions": stats["expired"],
+            "evicted_sessions": stats["evicted"],
+            "session_memory_bytes": stats["memory"],
+            "render_in_flight": self.renderer.in_flight,
+            "canvas_cache_bytes": self.renderer.canvases.size,
+            "text_fallback_platforms": len(self.image_latency.degraded),
+            "stats_pending": self.player_stats.pending if self.player_stats else 0,
+        }
+
+    def start_metrics_exporter(self):
+        path = self.config.get("metrics_file", "")
+        if path:
+            METRICS.start_exporter(
+                path, self.config.get("metrics_interval", 15), self.metrics_gauges
+            )
+
     @wordle.command("dict")
     async def manage_dict(
         self,
@@ -140,86 +704,299 @@ class PluginWordle(Star):
     ):
         """管理词典"""
         if action == "list":
-            dict_files = [
-                f.replace(".txt", "")
-                for f in os.listdir(self.dict_folder)
-                if f.endswith(".txt")
-            ]
+            dict_files = self.dictionaries.names()
             if not dict_files:
                 yield event.plain_result("未找到任何词典文件，请先添加词典到dict文件夹")
                 return
 
-            msg = f"当前使用词典: {self.current_dict}\n可用词典列表:\n"
+            default_dict = self.config.get("default_dict", "classic")
+            msg = (
+                f"当前会话使用词典: {self.session_dict(event.unified_msg_origin)}\n"
+                f"默认词典: {default_dict}\n可用词典列表:\n"
+            )
+            loaded = set(self.dictionaries.loaded_names())
             for dict_file in dict_files:
-                msg += f"- {dict_file}\n"
+                suffix = " (已编译)" if self.dictionaries.is_compiled(dict_file) else ""
+                if dict_file in loaded:
+                    suffix += " (已加载)"
+                refs = self.dictionaries.references(dict_file)
+                if refs:
+                    suffix += f" ({refs}局使用中)"
+                msg += f"- {dict_file}{suffix}\n"
             yield event.plain_result(msg)
 
-        elif action == "set":
+        elif action in ("set", "default"):
+            if action == "default" and not event.is_admin():
+                yield event.plain_result("只有管理员可以设置默认词典")
+                return
+
             if not dict_name:
                 yield event.plain_result(
                     "请指定词典名称，例如: /wordle dict set classic"
                 )
                 return
 
-            dict_path = os.path.join(self.dict_folder, f"{dict_name}.txt")
-            if not os.path.exists(dict_path):
+            if not self.dictionaries.exists(dict_name):
                 yield event.plain_result(f"词典 {dict_name} 不存在，请先添加词典文件")
                 return
 
-            self.current_dict = dict_name
-            yield event.plain_result(f"已设置当前词典为: {dict_name}")
+            # 预先加载，避免下一局开始时才解析词典
+            try:
+                await asyncio.to_thread(self.dictionaries.get, dict_name)
+            except Exception as e:
+                logger.error(f"加载词表失败: {e!s}")
+                yield event.plain_result(f"词典 {dict_name} 加载失败")
+                return
+
+            if action == "default":
+                self.config["default_dict"] = dict_name
+                self.config.save_config()
+                yield event.plain_result(f"已设置默认词典为: {dict_name}")
+                return
+
+            try:
+                await asyncio.to_thread(
+                    self.dict_choices.set, event.unified_msg_origin, dict_name
+                )
+            except OSError as e:
+                logger.error(f"保存词典选择失败: {e!s}")
+            yield event.plain_result(f"已设置当前会话词典为: {dict_name}")
+        elif action == "reset":
+            try:
+                await asyncio.to_thread(
+                    self.dict_choices.set, event.unified_msg_origin, None
+                )
+            except OSError as e:
+                logger.error(f"保存词典选择失败: {e!s}")
+            default_dict = self.config.get("default_dict", "classic")
+            yield event.plain_result(f"当前会话已改用默认词典: {default_dict}")
+        elif action == "compile":
+            if not dict_name:
+                yield event.plain_result(
+                    "请指定词典名称，例如: /wordle dict compile all"
+                )
+                return
+
+            if not os.path.isfile(self.dictionaries.path(dict_name)):
+                yield event.plain_result(f"词典 {dict_name} 没有对应的txt源文件")
+                return
+
+            try:
+                count = await asyncio.to_thread(self.dictionaries.compile, dict_name)
+            except Exception as e:
+                logger.error(f"编译词典失败: {e!s}")
+                yield event.plain_result(f"词典 {dict_name} 编译失败")
+                return
+
+            yield event.plain_result(f"已编译词典 {dict_name}，共{count}个单词")
         else:
-            yield event.plain_result("未知操作，可用操作: list, set")
+            yield event.plain_result(
+                "未知操作，可用操作: list, set, reset, default, compile"
+            )
 
-    @filter.event_message_type(EventMessageType.ALL)  # noqa: F405
+    @wordle.command("board")
+    async def set_board_mode(self, event: AstrMessageEvent, mode: str = ""):
+        """设置当前会话的棋盘样式：image图片，text文字，auto图片过慢时改用文字"""
+        session_id = event.unified_msg_origin
+        if not mode:
+            lines = [f"当前会话棋盘样式: {self.session_board_mode(session_id)}"]
+            platform = event.get_platform_name()
+            latency = self.image_latency.latency(platform)
+            if latency is not None:
+                degraded = platform in self.image_latency.degraded
+                lines.append(
+                    f"本平台图片棋盘平均耗时: {latency * 1000:.0f}ms"
+                    + ("（auto模式下暂时改用文字）" if degraded else "")
+                )
+            lines.append(f"可选: {', '.join(BOARD_MODES)}，例如: /wordle board text")
+            yield event.plain_result("\n".join(lines))
+            return
+        if mode not in BOARD_MODES:
+            yield event.plain_result(f"未知的棋盘样式，可选: {', '.join(BOARD_MODES)}")
+            return
+
+        try:
+            await asyncio.to_thread(self.board_modes.set, session_id, mode)
+        except OSError as e:
+            logger.error(f"保存棋盘样式失败: {e!s}")
+        yield event.plain_result(f"已设置当前会话棋盘样式为: {mode}")
+
+    @filter.event_message_type(EventMessageType.ALL)
     async def on_all_message(self, event: AstrMessageEvent):
         msg = event.get_message_str()
         session_id = event.unified_msg_origin
-        if session_id in self.game_sessions and event.is_at_or_wake_command:
-            game = self.game_sessions[session_id]
-
+        if not event.is_at_or_wake_command:
+            return
+        game = await self.get_session(session_id)
+        if game is not None:
             for ignore in IGNORGE_MSG:
                 if ignore in msg:
                     return
 
-            length = game.length
-            if len(msg) != length:
-                yield event.plain_result(f"输入单词长度应该为{length}")
+            with METRICS.timer("validate"):
+                rejection = self.validate_guess(game, msg)
+            if rejection is not None:
+                reason, reply = rejection
+                METRICS.incr(f"rejected_{reason}")
+                yield event.plain_result(reply)
                 return
 
-            if not msg.isalpha():
-                yield event.plain_result("输入应该是英文")
+            sender = event.get_sender_name() or event.get_sender_id()
+            pending = PendingGuess(msg.upper(), sender, event.get_sender_id(), game)
+            if not self.guess_queue.submit(session_id, pending):
+                # 该会话已有消息在处理队列，这次猜测会被合并到下一批
                 return
+            async with aclosing(self.guess_queue.batches(session_id)) as batches:
+                async for batch in batches:
+                    await self.play_batch(event, session_id, batch)
 
-            if msg.upper() not in game.valid_words:
-                yield event.plain_result("该单词不在有效词表中，请重新输入")
-                return
+    async def play_batch(
+        self, event: AstrMessageEvent, session_id: str, batch: list[PendingGuess]
+    ):
+        """按顺序应用一批猜测，只渲染和发送一次，中途结束时丢弃剩余猜测
+
+        困难模式的约束在提交时只按当时的反馈检查，同一批中前面的猜测会带来新约束，
+        因此应用前逐个重新检查，不满足的猜测跳过并告知
+        """
+        start = time.perf_counter()
+        game = batch[0].game
+        if self.game_sessions.get(session_id) is not game:
+            return
 
-            image_result = await game.guess(msg)
+        applied: list[PendingGuess] = []
+        skipped: list[tuple[PendingGuess, str]] = []
+        for pending in batch:
+            if pending.game is not game or game.is_game_over:
+                break
+            violation = game.hard_mode_violation(pending.word)
+            if violation is not None:
+                METRICS.incr("rejected_hard_mode")
+                skipped.append((pending, violation))
+                continue
+            game.apply_guess(pending.word)
+            game.players[pending.sender_id] = pending.sender
+            applied.append(pending)
+        METRICS.incr("guesses", len(applied))
+        METRICS.incr("coalesced_guesses", max(0, len(applied) - 1))
+
+        skipped_note = "\n".join(
+            f"困难模式: {p.sender}({p.word})未计入，{violation}"
+            for p, violation in skipped
+        )
+        if not applied:
+            with METRICS.timer("send"):
+                await event.send(MessageChain().message(skipped_note))
+            return
 
-            # 保证兼容性,处理Windows下非法路径问题
-            session_id_ps = re.sub(r'[\\/:*?"<>|!]', "_", session_id)
-            img_path = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)),
-                f"{session_id_ps}_{len(game.guesses)}_wordle.png",
-            )
-            with open(img_path, "wb") as f:
-                f.write(image_result)
-
-            if game.is_won:
-                sender_info = (
-                    event.get_sender_name()
-                    if event.get_sender_name()
-                    else event.get_sender_id()
-                )
-                game_status = f"恭喜{sender_info}猜对了！正确答案是: {game.answer}"
-                del self.game_sessions[session_id]
-            elif game.is_game_over:
-                game_status = f"游戏结束。正确答案是: {game.answer}"
-                del self.game_sessions[session_id]
-            else:
-                game_status = f"已猜测 {len(game.guesses)}/{game.max_attempts} 次"
+        platform = event.get_platform_name()
+        use_text = self.use_text_board(session_id, platform)
+        board_start = time.perf_counter()
+        if use_text:
+            with METRICS.timer("text"):
+                board = game.gen_text()
+        else:
+            image_result = await game.gen_image()
+            if self.game_sessions.get(session_id) is not game:
+                # 渲染期间游戏被结束或替换，不能再写回会话或记录结果
+                METRICS.incr("stale_batches")
+                with METRICS.timer("send"):
+                    await event.send(
+                        MessageChain().message(
+                            "游戏已结束或已开始新的一局，本轮猜测未计入"
+                        )
+                    )
+                return
 
-            await event.send(MessageChain().file_image(img_path).message(game_status))
+        if game.is_won:
+            winner = applied[-1].sender
+            game_status = f"恭喜{winner}猜对了！正确答案是: {game.answer}"
+            self.end_session(session_id)
+            self.record_result(session_id, game)
+            METRICS.incr("games_won")
+        elif game.is_game_over:
+            game_status = f"游戏结束。正确答案是: {game.answer}"
+            self.end_session(session_id)
+            self.record_result(session_id, game)
+            METRICS.incr("games_lost")
+        else:
+            game_status = f"已猜测 {len(game.guesses)}/{game.max_attempts} 次"
+            self.save_session(session_id, game)
+
+        if game.is_game_over and isinstance(game, WordleDaily):
+            game_status += "\n发送 /wordle daily result 查看今日各会话的结果"
+        if len(applied) > 1:
+            guessers = "、".join(f"{p.sender}({p.word})" for p in applied)
+            game_status = f"本轮猜测: {guessers}\n{game_status}"
+        if skipped_note:
+            game_status += f"\n{skipped_note}"
+        dropped = len(batch) - len(applied) - len(skipped)
+        if dropped:
+            game_status += f"\n游戏已结束，{dropped}个猜测未计入"
+
+        if use_text:
+            METRICS.incr("text_boards")
+            with METRICS.timer("send"):
+                await event.send(MessageChain().message(f"{board}\n{game_status}"))
+        else:
+            await self.send_board(event, image_result, game_status)
+            self.image_latency.observe(platform, time.perf_counter() - board_start)
+        METRICS.observe("message", time.perf_counter() - start)
+
+    def validate_guess(self, game: WordleBase, msg: str) -> tuple[str, str] | None:
+        """返回(拒绝原因, 回复)，合法的猜测返回None"""
+        if len(msg) != game.length:
+            return "length", f"输入单词长度应该为{game.length}"
+        if not msg.isalpha():
+            return "not_alpha", "输入应该是英文"
+        if msg.upper() not in game.valid_words:
+            return "unknown_word", "该单词不在有效词表中，请重新输入"
+        violation = game.hard_mode_violation(msg.upper())
+        if violation is not None:
+            return "hard_mode", f"困难模式: {violation}"
+        return None
+
+    async def on_session_expired(self, session_id: str, game: WordleBase, reason: str):
+        if self.persistence is not None:
+            self.persistence.delete(session_id)
+        self.dictionaries.release(game.dict_name)
+        self.forfeit_daily(session_id, game)
+        if not self.config.get("notify_on_expire", True):
+            return
+        action = "长时间无人猜测" if reason == "expired" else "会话数已达上限"
+        if isinstance(game, WordleDaily):
+            # 其他会话当天仍在猜同一个答案，不公布
+            notice = f"{action}，每日挑战已结束并记为未完成"
+        else:
+            notice = f"{action}，游戏已结束。正确答案是: {game.answer}"
+        try:
+            await self.context.send_message(session_id, MessageChain().message(notice))
+        except Exception as e:
+            logger.warning(f"发送游戏过期通知失败: {e!s}")
+
+    async def send_board(self, event: AstrMessageEvent, image: bytes, text: str):
+        """优先直接发送内存中的图片，平台不支持时经由临时文件发送"""
+        if event.get_platform_name() not in self.config.get("file_image_platforms", []):
+            encoded = base64.b64encode(image).decode()
+            with METRICS.timer("send"):
+                await event.send(MessageChain().base64_image(encoded).message(text))
+            return
 
-            os.remove(img_path)
+        suffix = self.renderer.encoder.options.suffix
+        async with self.spool.spooled(
+            event.unified_msg_origin, image, suffix
+        ) as img_path:
+            with METRICS.timer("send"):
+                await event.send(MessageChain().file_image(img_path).message(text))
+
+    async def terminate(self):
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+        self.hints.close()
+        self.renderer.shutdown()
+        self.spool.stop_sweeper()
+        self.game_sessions.stop_sweeper()
+        METRICS.stop_exporter()
+        if self.persistence is not None:
+            await self.persistence.close()
+        if self.player_stats is not None:
+            await self.player_stats.close()
@@ -0,0 +1,98 @@
+"""WordleMulti增量维护的猜中棋盘和键盘状态与原先逐格重新计算的结果一致
+
+用法: python -m pytest -q tests
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PLUGIN_DIR)
+
+from games.wordle_multi import WordleMulti
+
+LENGTH = 5
+GAMES = 30
+
+
+def load_words(length: int) -> list[str]:
+    with open(os.path.join(PLUGIN_DIR, "dict", "classic.txt"), encoding="utf-8") as f:
+        words = {
+            word.upper()
+            for word in f.read().split()
+            if len(word) == length and word.isascii() and word.isalpha()
+        }
+    return sorted(words)
+
+
+def brute_force_solved_at(game: WordleMulti) -> dict[int, int]:
+    """原实现：对每个棋盘按顺序查找第一次全绿的猜测"""
+    solved_at = {}
+    for grid_idx, _ in enumerate(game._answers):
+        for guess_idx, _ in enumerate(game._guesses):
+            if all(
+                game._feedbacks[guess_idx][grid_idx][i] == 2
+                for i in range(game._length)
+            ):
+                solved_at[grid_idx] = guess_idx
+                break
+    return solved_at
+
+
+def brute_force_keyboard(game: WordleMulti) -> dict[str, list[int]]:
+    """原实现：每次猜测按 字母×棋盘×位置 三重循环更新键盘状态"""
+    keyboard_status = {chr(i + ord("A")): [-1] * len(game._answers) for i in range(26)}
+    for guess_idx, word in enumerate(game._guesses):
+        for letter in word:
+            for grid_idx, _ in enumerate(game._answers):
+                for i, char in enumerate(word):
+                    if char == letter:
+                        feedback_value = game._feedbacks[guess_idx][grid_idx][i]
+                        current_status = keyboard_status[letter][grid_idx]
+                        if feedback_value > current_status:
+                            keyboard_status[letter][grid_idx] = feedback_value
+    return keyboard_status
+
+
+def brute_force_is_won(game: WordleMulti) -> bool:
+    if not game._guesses:
+        return False
+    return len(brute_force_solved_at(game)) == len(game._answers)
+
+
+@pytest.fixture(scope="module")
+def words() -> list[str]:
+    words = load_words(LENGTH)
+    if len(words) < 64:
+        pytest.skip("词典中的单词不足")
+    return words
+
+
+@pytest.mark.parametrize("boards", [2, 8, 16])
+def test_incremental_state_matches_brute_force(words: list[str], boards: int):
+    rng = random.Random(boards)
+    for _ in range(GAMES):
+        answers = rng.sample(words, boards)
+        game = WordleMulti(answers, frozenset(words))
+        while not game.is_game_over:
+            # 一半的猜测取自答案，保证出现猜中的棋盘
+            if rng.random() < 0.5:
+                word = rng.choice(game.remaining_answers)
+            else:
+                word = rng.choice(words)
+            game.apply_guess(word)
+
+            assert game.solved_at == brute_force_solved_at(game)
+            assert game._keyboard_status == brute_force_keyboard(game)
+            assert game.is_won == brute_force_is_won(game)
+            assert game.is_game_over == (
+                len(game._guesses) >= game.max_attempts or brute_force_is_won(game)
+            )
+            assert game.remaining_answers == [
+                answer
+                for grid_idx, answer in enumerate(game._answers)
+                if grid_idx not in brute_force_solved_at(game)
+            ]